@@ -1,24 +1,30 @@
 #!/usr/bin/env python3
+import io
 import os
 import pdb
 import time
+import asyncio
 import datetime
+import concurrent.futures
+import functools
 import schedule
-import threading
 
-from telegram.ext import Updater, InlineQueryHandler, CommandHandler
+from telegram.ext import Application, CommandHandler
 
 
+from MoneyCsv.utils import get_midnight
+from MoneyCsv.metrics import METRICS
 from MoneyCsv.statistics import *
-from MoneyCsv.parsing import DataFile, DataFileList, DataItem_with_discount
+from MoneyCsv.statistics.render_pool import ChartRenderPool
+from MoneyCsv.parsing import DataFolder, SnapshotPublisher
 from MoneyCsv.consts import *
 from MoneyCsv.filters import *
-from MoneyCsv.filters_special import *
 
 MAIN_FOLDER = os.path.dirname(__file__)
 KEY_FILEPATH = os.path.join(TELEGRAM_DATA_DIRECTORY, "key")
 CHAT_ID_FILEPATH = os.path.join(TELEGRAM_DATA_DIRECTORY, "chat_id")
 LOG_FILE = open(os.path.join(MAIN_FOLDER, "log.log"), "a")
+SLOW_LOG_FILE = open(os.path.join(MAIN_FOLDER, "slow.log"), "a")
 
 # utils
 def read_file(filename):
@@ -33,30 +39,48 @@ def log(s):
 	LOG_FILE.write('\n')
 	LOG_FILE.flush()
 
+def slow_log(s):
+	log(s)
+	SLOW_LOG_FILE.write(s)
+	SLOW_LOG_FILE.write('\n')
+	SLOW_LOG_FILE.flush()
+
 # wrappers
+# every command is a coroutine, thus the wrappers are coroutines as well
 def log_command(func):
-	def func_wrapper(*args, **kwargs):
+	async def func_wrapper(*args, **kwargs):
 		# each function is named "command_something"
 		command_name = func.__name__[8:]
 
 		if "scheduled" in kwargs:
 			if kwargs["scheduled"]:
 				log(f"    [*] scheduled command - {command_name}\t{time.asctime()}")
+			command_text = f"(scheduled) {command_name}"
 			kwargs.pop("scheduled")
 		else:
 			# args[1] is update
 			if len(args) > 1 and args[1]:
-				command_text = args[1]['message']['text']
+				command_text = args[1].message.text
 			else:
 				command_text = "None"
 			log(f"    [*] got command - {command_text}\tcalling {command_name}\t{time.asctime()}")
 
-		return func(*args, **kwargs)
+		status = "error"
+		start = time.perf_counter()
+		try:
+			result = await func(*args, **kwargs)
+			status = "ok"
+			return result
+		finally:
+			elapsed = time.perf_counter() - start
 
-	return func_wrapper
+			METRICS.histogram("command_seconds", "command latency", command=command_name).observe(elapsed)
+			METRICS.counter("commands_total", "amount of handled commands", command=command_name, status=status).inc()
+
+			if elapsed > SLOW_COMMAND_THRESHOLD_IN_SECONDS:
+				slow_log(f"    [s] slow command - {command_text}\t{elapsed:.3f}s\t{status}\t{time.asctime()}")
 
-def void(*args, **kwargs):
-	return None
+	return func_wrapper
 
 """
 requires:
@@ -64,23 +88,23 @@ requires:
 	2) self.user_names    - a list of strings, in the same length as self.user_chat_ids
 """
 def whitelisted_command(func):
-	def func_wrapper(*args, **kwargs):
+	async def func_wrapper(*args, **kwargs):
 		self = args[0]
 		if len(args) > 1 and args[1]:
 			update = args[1]
-			chat_id = update['message']['chat']['id']
+			chat_id = update.effective_chat.id
 			if chat_id == self._chat_id:
 				log(f"[+] whitelist - success - {chat_id}")
 			else:
 				log(f"[-] whitelist - error - {chat_id}")
 				log(str(update))
 				log('\n')
-				return void
+				return None
 		else:
 			# scheduled command
 			log(f"[*] whitelist - ignored (scheduled)")
 
-		return func(*args, **kwargs)
+		return await func(*args, **kwargs)
 
 	return func_wrapper
 
@@ -90,38 +114,65 @@ class TelegramServer(object):
 	def __init__(self):
 		# server initialization
 		self._key = read_file(KEY_FILEPATH)
-		self.updater = Updater(self._key, use_context=True)
-		self.dp = self.updater.dispatcher
+		self.application = (
+			Application.builder()
+			.token(self._key)
+			# handle commands concurrently, rather than one after the other
+			.concurrent_updates(True)
+			.post_init(self._start_background_tasks)
+			.build()
+		)
 
 		self._chat_id = int(read_file(CHAT_ID_FILEPATH))
 
+		# references to running tasks (the event loop only keeps weak references)
+		self._tasks = set()
+
 	def chat_id(self, update=None):
 		if update:
-			return update['message']['chat']['id']
+			return update.effective_chat.id
 		else:
 			return self._chat_id
 
-	def send_text(self, text, chat_id):
-		self.updater.bot.sendMessage(
+	async def send_text(self, text, chat_id):
+		await self.application.bot.send_message(
 			chat_id,
 			text
 		)
 
-	def send_image(self, image_file, chat_id, **kwargs):
-		self.updater.bot.send_photo(
+	async def send_image(self, image_file, chat_id, **kwargs):
+		await self.application.bot.send_photo(
 			chat_id,
 			photo=image_file,
 			**kwargs
 		)
 
+	async def run_blocking(self, func, *args, **kwargs):
+		"""
+		runs a CPU bound function (filtering, stats, reload) in the default executor
+			thus the event loop keeps handling other commands meanwhile
+		"""
+		return await asyncio.get_running_loop().run_in_executor(
+			None,
+			functools.partial(func, *args, **kwargs)
+		)
+
+	def spawn(self, coroutine):
+		task = asyncio.get_running_loop().create_task(coroutine)
+		self._tasks.add(task)
+		task.add_done_callback(self._tasks.discard)
+		return task
+
+	async def _start_background_tasks(self, application):
+		# called by the application once its event loop is running
+		pass
+
 	def loop(self):
 		print("[*] entering loop")
-		self.updater.start_polling()
-		self.updater.idle()
+		self.application.run_polling()
 
 class TelegramCommands(object):
 	def __init__(self):
-		self.command_reload()
 		self.add_all_handlers()
 
 	def _command_name(self, c):
@@ -134,19 +185,19 @@ class TelegramCommands(object):
 		)
 
 		for command_name in commands:
-			self.dp.add_handler(CommandHandler(
+			self.application.add_handler(CommandHandler(
 				self._command_name(command_name),
 				getattr(self, command_name)
 			))
 
-	def parse_args(self, context, *expected_types):
+	async def parse_args(self, context, *expected_types):
 		result = []
 		if context and context.args:
 			try:
 				for i in range(len(context.args)):
 					result.append(expected_types[i](context.args[i]))
 			except Exception as e:
-				self.send_text(
+				await self.send_text(
 					f"parse_args error: {e} ; args = {context.args}",
 					# send it to me, not to the user (avoiding information disclosure)
 					self.chat_id()
@@ -161,24 +212,24 @@ class TelegramCommands(object):
 	# debug
 	@whitelisted_command
 	@log_command
-	def command_pdb(self, update=None, context=None):
+	async def command_pdb(self, update=None, context=None):
 		pdb.set_trace()
 
 	@whitelisted_command
 	@log_command
-	def command_start(self, update, context):
+	async def command_start(self, update, context):
 		chat_id = self.chat_id(update)
 		log("chat_id = %s" % chat_id)
 
 	@whitelisted_command
 	@log_command
-	def command_list_commands(self, update=None, context=None):
+	async def command_list_commands(self, update=None, context=None):
 		commands = filter(
 			lambda s: s.startswith("command_"),
 			dir(self)
 		)
 
-		self.send_text(
+		await self.send_text(
 			'\n'.join(
 				f"{self._command_name(c)} - {self._command_name(c)}"
 				for c in commands
@@ -189,57 +240,92 @@ class TelegramCommands(object):
 
 	@whitelisted_command
 	@log_command
-	def command_reload(self, update=None, context=None):
-		self.datafiles.reload()
-		log(f"    [r] reloaded : {time.asctime()}")
+	async def command_reload(self, update=None, context=None):
+		# builds a new snapshot, while the other handlers keep using the current one
+		with METRICS.histogram("reload_seconds", "time spent building and preparing a new snapshot").time():
+			snapshot = await self.run_blocking(self.snapshots.reload)
+		METRICS.counter("reloads_total", "amount of reloads").inc()
+		log(f"    [r] reloaded : {snapshot} : {time.asctime()}")
 
 		# if update is None - we are called from the scheduler
 		# only answer the user if the user asks the reload
 		if update is not None:
-			self.send_text(
-				"reload - done",
+			await self.send_text(
+				f"reload - done ({snapshot.changes.summary()})",
 				self.chat_id(update)
 			)
 
+	@whitelisted_command
+	@log_command
+	async def command_changes(self, update=None, context=None):
+		# the rows which changed in the last reload
+		changes = self.snapshots.current.changes
+
+		if changes is None:
+			text = "no reload yet"
+		else:
+			text = changes.to_text(CHANGES_MAX_LINES)
+
+		await self.send_text(
+			text,
+			self.chat_id(update)
+		)
+
 
 	#
-	def filtered_time_command(self, f, update=None):
-		g = GroupedStats_Subject(
-			f % self.datafiles.data,
-			selected_time=f.selected_time,
-			group_value="money"
+	def _filtered_time_text(self, f, snapshot=None):
+		snapshot = snapshot or self.snapshots.current
+
+		def compute():
+			g = DetailedStats_AllGroups(
+				f % snapshot.data,
+				time_filter=f,
+				grouping_method="amount"
+			)
+			return g.to_telegram()
+
+		# some time filters are relative to today (e.g. TimeFilter_Days), thus today is a part of the key
+		return snapshot.cached(
+			("text", datetime.date.today(), repr(f)),
+			compute
 		)
 
-		self.send_text(
-			g.to_telegram(),
+	async def filtered_time_command(self, f, update=None):
+		text = await self.run_blocking(self._filtered_time_text, f)
+
+		await self.send_text(
+			text,
 			self.chat_id(update)
 		)
 
 	@whitelisted_command
 	@log_command
-	def command_today(self, update=None, context=None):
-		self.filtered_time_command(TimeFilter_Days(1), update)
+	async def command_today(self, update=None, context=None):
+		await self.filtered_time_command(TimeFilter_Days(1), update)
 
 	@whitelisted_command
 	@log_command
-	def command_week(self, update=None, context=None):
-		self.filtered_time_command(TimeFilter_Days(7), update)
+	async def command_week(self, update=None, context=None):
+		await self.filtered_time_command(TimeFilter_Days(7), update)
 
 	@whitelisted_command
 	@log_command
-	def command_month(self, update=None, context=None):
-		month, year = self.parse_args(context, int, int)
-		self.filtered_time_command(TimeFilter_Month(month, year), update)
+	async def command_month(self, update=None, context=None):
+		month, year = await self.parse_args(context, int, int)
+		await self.filtered_time_command(TimeFilter_Month(month, year), update)
 
 	@whitelisted_command
 	@log_command
-	def command_year(self, update=None, context=None):
-		year, = self.parse_args(context, int)
-		self.filtered_time_command(TimeFilter_Year(year), update)
+	async def command_year(self, update=None, context=None):
+		year, = await self.parse_args(context, int)
+		await self.filtered_time_command(TimeFilter_Year(year), update)
 
 	@whitelisted_command
 	@log_command
-	def command_yesterday(self, update=None, context=None):
+	async def command_yesterday(self, update=None, context=None):
+		await self.filtered_time_command(self._yesterday_filter(), update)
+
+	def _yesterday_filter(self):
 		stop_time  = get_midnight( datetime.datetime.now() )
 		start_time = get_midnight(
 			stop_time
@@ -247,14 +333,14 @@ class TelegramCommands(object):
 			datetime.timedelta(days=1)
 		)
 
-		self.filtered_time_command(
-			TimeFilter_DateRange( start_time, stop_time ),
-			update
-		)
+		return TimeFilter_DateRange( start_time, stop_time )
 
 	@whitelisted_command
 	@log_command
-	def command_last_week(self, update=None, context=None):
+	async def command_last_week(self, update=None, context=None):
+		await self.filtered_time_command(self._last_week_filter(), update)
+
+	def _last_week_filter(self):
 		today = datetime.datetime.now()
 
 		if WEEK_STARTS_AT_SUNDAY:
@@ -266,117 +352,219 @@ class TelegramCommands(object):
 		this_sunday = get_midnight(today - datetime.timedelta(days=weekday))
 		prev_sunday = this_sunday - datetime.timedelta(days=7)
 
-		self.filtered_time_command(
-			TimeFilter_DateRange( prev_sunday, this_sunday ),
-			update
-		)
+		return TimeFilter_DateRange( prev_sunday, this_sunday )
 
 
 	#
-	def pie_command(self, g_cls, f, update=None):
-		g = g_cls(
-			f % self.datafiles.data,
-			selected_time=f.selected_time,
-			group_value="money"
+	def _pie_chart_spec(self, g_cls, f, snapshot=None):
+		snapshot = snapshot or self.snapshots.current
+
+		def compute():
+			g = g_cls(
+				f % snapshot.data,
+				time_filter=f,
+				grouping_method="amount"
+			)
+			return g.chart_spec("pie")
+
+		return snapshot.cached(
+			("pie", datetime.date.today(), g_cls.__qualname__, repr(f)),
+			compute
 		)
 
-		# TODO:
-		# this initializes self.headers_sorted, self.values_sorted
-		# there should be a better (and automated) way to initialize them
-		g.group()
+	async def pie_command(self, g_cls, f, update=None):
+		spec = await self.run_blocking(self._pie_chart_spec, g_cls, f)
 
-		pie_file = g.to_pie()
+		# rendering is done by the render pool, while the event loop keeps handling other commands
+		try:
+			with METRICS.histogram("render_seconds", "time spent waiting for a rendered chart (including cache hits)").time():
+				png = await asyncio.wrap_future(self.render_pool.submit(spec))
+		except Exception as e:
+			log(f"    [!] rendering failed : {e}\t{time.asctime()}")
+			await self.send_text(f"rendering failed: {e}", self.chat_id())
+			return
 
-		self.send_image(
-			pie_file,
+		await self.send_image(
+			io.BytesIO(png),
 			self.chat_id(update)
 		)
 
 	@whitelisted_command
 	@log_command
-	def command_pie_week(self, update=None, context=None):
-		self.pie_command(GroupedStats_Subject, TimeFilter_Days(7), update)
+	async def command_pie_week(self, update=None, context=None):
+		await self.pie_command(DetailedStats_AllGroups, TimeFilter_Days(7), update)
 
 	@whitelisted_command
 	@log_command
-	def command_pie_month(self, update=None, context=None):
-		month, year = self.parse_args(context, int, int)
-		self.pie_command(GroupedStats_Subject, TimeFilter_Month(month, year), update)
+	async def command_pie_month(self, update=None, context=None):
+		month, year = await self.parse_args(context, int, int)
+		await self.pie_command(DetailedStats_AllGroups, TimeFilter_Month(month, year), update)
 
 	@whitelisted_command
 	@log_command
-	def command_pie_friends(self, update=None, context=None):
-		month, = self.parse_args(context, int)
-		self.pie_command(GroupedStats_Friend, TimeFilter_Month(month), update)
+	async def command_pie_friends(self, update=None, context=None):
+		month, = await self.parse_args(context, int)
+		await self.pie_command(DetailedStats_Friend, TimeFilter_Month(month), update)
 
 	@whitelisted_command
 	@log_command
-	def command_pie_shopping(self, update=None, context=None):
-		month, = self.parse_args(context, int)
+	async def command_pie_shopping(self, update=None, context=None):
+		month, = await self.parse_args(context, int)
 		def g(data, *args, **kwargs):
-			return FilteredGroupedStats(data, filter_shopping, *args, **kwargs)
-		self.pie_command(g, TimeFilter_Month(month), update)
+			return DetailedStats_AllGroups(filter_shopping % data, *args, **kwargs)
+		await self.pie_command(g, TimeFilter_Month(month), update)
+
+
+	#
+	# Precomputed reports
+	#
+	def _report_filters(self):
+		"""
+		the time filters of the scheduled reports, and of the commonly used commands
+		"""
+		text_filters = [
+			TimeFilter_Days(1),         # today
+			TimeFilter_Days(7),         # week, pie_week
+			TimeFilter_Month(),         # month, pie_month
+			self._yesterday_filter(),   # daily report
+			self._last_week_filter(),   # weekly report
+		]
+		pie_filters = [
+			TimeFilter_Days(7),
+			TimeFilter_Month(),
+		]
+		return text_filters, pie_filters
+
+	def precompute_reports(self, snapshot):
+		"""
+		called on every new snapshot, before it is published
+		stores the texts in the snapshot's cache, and the rendered charts in the chart cache
+			thus sending these reports is a cache hit
+		"""
+		try:
+			text_filters, pie_filters = self._report_filters()
+
+			for f in text_filters:
+				self._filtered_time_text(f, snapshot)
+
+			rendering = [
+				self.render_pool.submit(
+					self._pie_chart_spec(DetailedStats_AllGroups, f, snapshot)
+				)
+				for f in pie_filters
+			]
+			concurrent.futures.wait(rendering)
+		except Exception as e:
+			log(f"    [!] precomputing reports failed : {e}\t{time.asctime()}")
 
 
 class TelegramScheduledCommands(object):
 	def __init__(self):
 		self.schedule_commands()
 
+	def _schedule(self, job, command, **kwargs):
+		# `schedule` calls plain functions. each call spawns the command as a task on the event loop
+		job.do(
+			lambda: self.spawn(command(**kwargs))
+		)
+
 	def schedule_commands(self):
-		schedule.every().day.at("05:00").do(
+		self._schedule(
+			schedule.every().day.at("05:00"),
 			self.command_reload,
 			scheduled=True
 		)
 
 		# daily log
-		schedule.every().day.at("08:00").do(
+		self._schedule(
+			schedule.every().day.at("08:00"),
 			self.command_yesterday,
 			scheduled=True
 		)
 
 		# weekly log
-		schedule.every().sunday.at("08:00").do(
+		self._schedule(
+			schedule.every().sunday.at("08:00"),
 			self.command_last_week,
 			scheduled=True
 		)
-		schedule.every().sunday.at("08:00").do(
+		self._schedule(
+			schedule.every().sunday.at("08:00"),
 			self.command_pie_week,
 			scheduled=True
 		)
 
-		def monthly_report():
+		async def monthly_report():
 			if datetime.datetime.now().day == 1:
-				self.command_month(scheduled=True)
-				self.command_pie_month(scheduled=True)
-		schedule.every().day.at("08:00").do(
+				await self.command_month(scheduled=True)
+				await self.command_pie_month(scheduled=True)
+		self._schedule(
+			schedule.every().day.at("08:00"),
 			monthly_report,
 		)
 
+	async def run_scheduler(self):
+		while True:
+			schedule.run_pending()
+			await asyncio.sleep(SCHEDULER_INTERVAL_IN_SECONDS)
 
-		def run_scheduler():
-			while True:
-				schedule.run_pending()
-				time.sleep(60*60*0.5)
-
-		threading.Thread(target=run_scheduler).start()
-
-class TelegramAPI(TelegramServer, TelegramCommands, TelegramScheduledCommands):
+"""
+requires:
+	1) self.snapshots   - a SnapshotPublisher
+	2) self.render_pool - a ChartRenderPool
+"""
+class TelegramMetrics(object):
+	def load_data_folder(self):
+		with METRICS.histogram("load_seconds", "time spent loading the data folder").time():
+			data_object = DataFolder(DEFAULT_DATA_DIRECTORY)
+
+		METRICS.gauge("rows_loaded", "amount of rows in the last loaded data folder").set(len(data_object.data))
+		METRICS.gauge("files_loaded", "amount of files in the last loaded data folder").set(len(data_object.data_files))
+		return data_object
+
+	def update_metrics(self):
+		# the values which are owned by other objects are copied when exporting
+		snapshot = self.snapshots.current
+		METRICS.gauge("snapshot_version", "version of the current snapshot").set(snapshot.version)
+		METRICS.gauge("snapshot_cache_hits"  , "report cache hits of the current snapshot"  ).set(snapshot.hits)
+		METRICS.gauge("snapshot_cache_misses", "report cache misses of the current snapshot").set(snapshot.misses)
+
+		cache = self.render_pool.cache
+		METRICS.gauge("chart_cache_hits"  , "chart cache hits"  ).set(cache.hits)
+		METRICS.gauge("chart_cache_misses", "chart cache misses").set(cache.misses)
+		METRICS.gauge("chart_cache_items" , "charts in the chart cache").set(len(cache))
+
+	def write_metrics(self):
+		try:
+			self.update_metrics()
+			METRICS.write(METRICS_FILE_PATH)
+		except Exception as e:
+			log(f"    [!] writing metrics failed : {e}\t{time.asctime()}")
+
+	async def run_metrics_writer(self):
+		while True:
+			self.write_metrics()
+			await asyncio.sleep(METRICS_WRITE_INTERVAL_IN_SECONDS)
+
+class TelegramAPI(TelegramServer, TelegramCommands, TelegramScheduledCommands, TelegramMetrics):
 	def __init__(self):
 		TelegramServer.__init__(self)
+		self.render_pool = ChartRenderPool()
 		self.init_datafiles()
 		TelegramCommands.__init__(self)
 		TelegramScheduledCommands.__init__(self)
 
+	async def _start_background_tasks(self, application):
+		self.spawn(self.run_scheduler())
+		self.spawn(self.run_metrics_writer())
+
 	def init_datafiles(self):
-		self.visa = DataFile("Visa")
-		self.cash = DataFile("cash")
-		self.transactions = DataFile("Transactions")
-		self.isracard = DataFile("isracard",
-			data_item_class=DataItem_with_discount
+		# loads the first snapshot
+		self.snapshots = SnapshotPublisher(
+			self.load_data_folder,
+			prepare=self.precompute_reports,
 		)
 
-		self.datafiles = DataFileList(self.visa, self.cash, self.transactions, self.isracard)
-
 
 
 def main():
@@ -386,7 +574,10 @@ def main():
 
 	t = TelegramAPI()
 	t.loop()
+	t.write_metrics()
+	t.render_pool.shutdown()
 	LOG_FILE.close()
+	SLOW_LOG_FILE.close()
 
 if __name__ == '__main__':
 	main()
@@ -1,4 +1,39 @@
+import importlib
+
 from MoneyCsv.utils      import print_items
-from MoneyCsv.parsing    import *
-from MoneyCsv.filters    import *
-from MoneyCsv.statistics import *
+
+# the names of parsing, filters & statistics are exported as by `from ... import *`,
+# 	but the packages are imported on first use (PEP 562)
+# 	thus `python -m MoneyCsv` does not import the statistics (and matplotlib) before it needs them
+# 	(e.g. a query answered by the result cache - see cli/result_cache.py)
+_LAZY_PACKAGES = ("MoneyCsv.parsing", "MoneyCsv.filters", "MoneyCsv.statistics")
+
+def _public_names(module):
+	return [n for n in vars(module) if not n.startswith('_')]
+
+def __getattr__(name):
+	if name.startswith('__') and name != "__all__":
+		raise AttributeError(name)
+
+	if name == "__all__":
+		names = ["utils", "print_items"]
+		for package_name in _LAZY_PACKAGES:
+			names.append(package_name.split('.')[-1])
+			names += _public_names(importlib.import_module(package_name))
+		return list(dict.fromkeys(names))
+
+	# a submodule (e.g. `from MoneyCsv import cli`)
+	try:
+		return importlib.import_module(f"{__name__}.{name}")
+	except ModuleNotFoundError as e:
+		if e.name != f"{__name__}.{name}":
+			raise
+
+	# the later packages shadow the earlier ones, as the star imports did
+	for package_name in reversed(_LAZY_PACKAGES):
+		package = importlib.import_module(package_name)
+		if name in _public_names(package):
+			value = globals()[name] = getattr(package, name)
+			return value
+
+	raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
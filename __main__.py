@@ -1,4 +1,10 @@
+import sys
+
 from MoneyCsv.cli.cli import main
 
 if __name__ == '__main__':
-	print(main())
+	result = main(stream=sys.stdout)
+
+	# None means the output was already written to stdout
+	if result is not None:
+		print(result)
@@ -0,0 +1,3 @@
+from MoneyCsv.benchmarks.generate_data  import generate_data_folder
+from MoneyCsv.benchmarks.run_benchmarks import run_benchmarks    , \
+											   compare_to_baseline
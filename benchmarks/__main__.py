@@ -0,0 +1,67 @@
+import sys
+import argparse
+
+from MoneyCsv.benchmarks.generate_data  import generate_data_folder, SIZES
+from MoneyCsv.benchmarks.run_benchmarks import run_benchmarks, compare_to_baseline, \
+											   load_results, save_results, \
+											   DEFAULT_REGRESSION_THRESHOLD, DEFAULT_REPEAT
+
+# usage:
+# 	python -m MoneyCsv.benchmarks generate --size small --folder /tmp/MoneyCsv_bench
+# 	python -m MoneyCsv.benchmarks run --folder /tmp/MoneyCsv_bench --output results.json --baseline baseline.json
+
+DEFAULT_FOLDER = "/tmp/MoneyCsv_benchmark_data"
+
+def parse_args(args_list=None):
+	parser = argparse.ArgumentParser(prog="python -m MoneyCsv.benchmarks")
+	subparsers = parser.add_subparsers(dest="command", required=True)
+
+	generate = subparsers.add_parser("generate", help="generate a synthetic data folder")
+	generate.add_argument("--folder", "-f", type=str, default=DEFAULT_FOLDER, help="where to write the data")
+	generate.add_argument("--size"  , "-s", type=str, default="small"       , help=f"amount of rows - an int, or one of {', '.join(SIZES)}")
+	generate.add_argument("--seed"        , type=int, default=0             , help="random seed")
+
+	run = subparsers.add_parser("run", help="run the benchmarks")
+	run.add_argument("--folder"  , "-f", type=str  , default=DEFAULT_FOLDER              , help="the data folder to benchmark")
+	run.add_argument("--output"  , "-o", type=str  , default=None                        , help="write the results (json) to this path")
+	run.add_argument("--baseline", "-b", type=str  , default=None                        , help="compare against the results (json) at this path")
+	run.add_argument("--threshold"     , type=float, default=DEFAULT_REGRESSION_THRESHOLD, help="allowed slowdown relative to the baseline (0.2 is 20%%)")
+	run.add_argument("--repeat"        , type=int  , default=DEFAULT_REPEAT              , help="amount of runs per benchmark (the best is taken)")
+	run.add_argument("--only"          , type=str  , default=None                        , help="run only the benchmarks whose name contains this string")
+
+	return parser.parse_args(args_list)
+
+
+def main(args_list=None):
+	args = parse_args(args_list)
+
+	if args.command == "generate":
+		size = int(args.size) if args.size.isdigit() else args.size
+		generate_data_folder(args.folder, size, seed=args.seed)
+		print(f"[*] generated {args.folder}")
+		return 0
+
+	results = run_benchmarks(args.folder, repeat=args.repeat, only=args.only)
+
+	if args.output:
+		save_results(results, args.output)
+		print(f"[*] results written to {args.output}")
+
+	if args.baseline:
+		regressions = compare_to_baseline(results, load_results(args.baseline), args.threshold)
+
+		for name, baseline_seconds, seconds, ratio in regressions:
+			if seconds is None:
+				print(f"[!] regression : {name:50s} {baseline_seconds:10.4f}s -> error ({results['errors'][name]})")
+			else:
+				print(f"[!] regression : {name:50s} {baseline_seconds:10.4f}s -> {seconds:10.4f}s (x{ratio:.2f})")
+
+		if regressions:
+			return 1
+
+		print("[*] no regressions")
+
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,236 @@
+import os
+import csv
+import random
+import datetime
+
+from MoneyCsv.parsing.consts import BASE_HEADERS, COPY_LAST_DATE, ADD_LAST_DATE
+
+# Generates a synthetic data folder, in the same layout as the real one:
+# 	<folder>/<payment>/<year>.mcsv
+# every file uses all of the GENERATED_HEADERS, and the rows contain placeholder dates,
+# 	friends, locations & extra details
+
+
+# the columns written by `_format_row`
+# 	(Amountnis is not generated - the amounts in nis are converted by the rate tables)
+GENERATED_HEADERS = BASE_HEADERS + [
+	"PreDiscount_Amount",
+	"Payment",
+	"Currency",
+	"Amount_Converted",
+	"Frequency",
+]
+
+# named sizes, in rows
+SIZES = {
+	"small" : 10_000,
+	"medium": 1_000_000,
+	"large" : 10_000_000,
+}
+
+DEFAULT_START_DATE = datetime.datetime(2005, 1, 1)
+DEFAULT_YEARS = 20
+
+PAYMENTS = ["visa", "isracard", "cash", "transactions"]
+
+CURRENCIES = [
+	# name    , weight, rate (nis per unit)
+	("nis"    , 90    , 1   ),
+	("dollar" , 5     , 3.5 ),
+	("euro"   , 4     , 4   ),
+	("franc"  , 1     , 3.8 ),
+]
+
+FRIENDS = ["Alice", "Bob", "Carol", "Dan", "Eve", "Frank", "Grace", "Heidi"]
+LOCATIONS = ["Tel Aviv", "Jerusalem", "Haifa", "the beach", "the mall"]
+
+# group, description, extra details name, extra details values, amount range
+ITEMS = [
+	("Food"       , "pizza"      , "topping", ["olives", "mushrooms", "onion"] , (30  , 120 )),
+	("Food"       , "burger"     , None     , None                             , (40  , 90  )),
+	("Food"       , "falafel"    , None     , None                             , (15  , 30  )),
+	("Coffee"     , "latte"      , "size"   , ["small", "medium", "large"]     , (10  , 20  )),
+	("Coffee"     , "espresso"   , "size"   , ["single", "double"]             , (7   , 14  )),
+	("Supermarket", "groceries"  , None     , None                             , (50  , 600 )),
+	("Shekem"     , "snacks"     , "snack"  , ["bamba", "bisli", "chocolate"]  , (5   , 30  )),
+	("Wolt"       , "delivery"   , "from"   , ["thai", "sushi", "burgers"]     , (60  , 180 )),
+	("Book"       , "book"       , "title"  , ["dune", "hyperion", "foundation"], (40  , 120 )),
+	("Gaming"     , "game"       , "title"  , ["portal", "factorio", "celeste"], (20  , 250 )),
+	("Technology" , "cable"      , "type"   , ["usb-c", "hdmi", "ethernet"]    , (10  , 80  )),
+	("Transport"  , "bus"        , None     , None                             , (6   , 12  )),
+	("Transport"  , "taxi"       , None     , None                             , (30  , 150 )),
+	("Friends"    , "drinks"     , None     , None                             , (30  , 200 )),
+	("Gifts"      , "present"    , "for"    , ["birthday", "wedding"]          , (50  , 400 )),
+]
+
+# a monthly salary, in the first payment type only
+SALARY = ("Salary", "salary", (12000, 18000))
+
+
+class DataGenerator(object):
+	def __init__(self, rows, seed=0, start_date=DEFAULT_START_DATE, years=DEFAULT_YEARS):
+		self.rows = rows
+		self.start_date = start_date
+		self.days = years * 365
+
+		self._random = random.Random(seed)
+
+	#
+	# single values
+	#
+	def _currency(self):
+		name, _, rate = self._random.choices(
+			CURRENCIES,
+			weights=[c[1] for c in CURRENCIES]
+		)[0]
+		return name, rate
+
+	def _description(self, group, description, extra_details_name, extra_details_values):
+		r = self._random
+
+		if extra_details_name:
+			values = r.sample(extra_details_values, r.choice([1, 1, 1, 2]))
+			description += f" {extra_details_name} ({' ; '.join(values)})"
+
+		# friends are written after "with", e.g. "with Alice and Bob"
+		if group == "Friends" or r.random() < 0.1:
+			friends = r.sample(FRIENDS, r.choice([1, 1, 2, 3]))
+			if len(friends) == 1:
+				description += f" with {friends[0]}"
+			else:
+				description += f" with {' '.join(friends[:-1])} and {friends[-1]}"
+
+		if r.random() < 0.05:
+			description += f" @ {r.choice(LOCATIONS)} @"
+
+		return description
+
+	def _row(self, date_str):
+		r = self._random
+
+		group, description, extra_details_name, extra_details_values, (low, high) = r.choice(ITEMS)
+		currency, rate = self._currency()
+
+		amount = -round(r.uniform(low, high) / rate, 2)
+
+		# 10% of the transactions have a discount
+		if r.random() < 0.1:
+			prediscount_amount = round(amount * 0.9, 2)
+		else:
+			prediscount_amount = amount
+
+		if currency == "nis":
+			amount_converted = ''
+		else:
+			amount_converted = f"{amount * rate:.2f}"
+
+		frequency = "monthly" if group == "Technology" and r.random() < 0.1 else ''
+
+		return self._format_row(
+			date_str,
+			amount,
+			group,
+			self._description(group, description, extra_details_name, extra_details_values),
+			prediscount_amount,
+			currency,
+			amount_converted,
+			frequency,
+		)
+
+	def _salary_row(self, date_str):
+		group, description, (low, high) = SALARY
+		amount = round(self._random.uniform(low, high), 2)
+		return self._format_row(date_str, amount, group, description, amount, "nis", '', "monthly")
+
+	def _format_row(self, date_str, amount, group, description, prediscount_amount, currency, amount_converted, frequency):
+		# ordered by GENERATED_HEADERS
+		return [
+			date_str,
+			f"{amount:.2f}",
+			group,
+			description,
+			f"{prediscount_amount:.2f}",
+			self._payment,
+			currency,
+			amount_converted,
+			frequency,
+		]
+
+	#
+	# dates
+	#
+	def _date_str(self, date, previous_date):
+		"""
+		uses the placeholders of the real files every once in a while
+		the first row of every file always has a full date
+		"""
+		if previous_date is not None and self._random.random() < 0.5:
+			if date == previous_date:
+				return COPY_LAST_DATE
+			if date - previous_date == datetime.timedelta(days=1):
+				return ADD_LAST_DATE
+
+		return date.strftime("%Y/%m/%d")
+
+	#
+	# files
+	#
+	def _iter_payment_rows(self, payment, rows):
+		"""
+		yields (date, row) tuples, ordered by date
+		"""
+		self._payment = payment
+		previous_date = None
+		previous_month = None
+
+		for i in range(rows):
+			date = self.start_date + datetime.timedelta(days=i * self.days // rows)
+
+			# a new file starts every year
+			if previous_date is not None and date.year != previous_date.year:
+				previous_date = None
+
+			if payment == PAYMENTS[0] and (date.year, date.month) != previous_month:
+				previous_month = (date.year, date.month)
+				yield date, self._salary_row(self._date_str(date, previous_date))
+				previous_date = date
+
+			yield date, self._row(self._date_str(date, previous_date))
+			previous_date = date
+
+	def write(self, folder):
+		rows_per_payment = self.rows // len(PAYMENTS)
+
+		for payment in PAYMENTS:
+			payment_folder = os.path.join(folder, payment)
+			os.makedirs(payment_folder, exist_ok=True)
+
+			handle = None
+			year = None
+
+			for date, row in self._iter_payment_rows(payment, rows_per_payment):
+				if date.year != year:
+					if handle is not None:
+						handle.close()
+
+					year = date.year
+					handle = open(os.path.join(payment_folder, f"{year}.mcsv"), "w", newline='')
+					writer = csv.writer(handle)
+					writer.writerow(GENERATED_HEADERS)
+
+				writer.writerow(row)
+
+			if handle is not None:
+				handle.close()
+
+		return folder
+
+
+def generate_data_folder(folder, rows=SIZES["small"], seed=0, years=DEFAULT_YEARS):
+	"""
+	rows is either an int, or one of the SIZES names
+	"""
+	if type(rows) is str:
+		rows = SIZES[rows]
+
+	return DataGenerator(rows, seed=seed, years=years).write(folder)
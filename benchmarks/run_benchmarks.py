@@ -0,0 +1,172 @@
+import gc
+import sys
+import json
+import time
+import platform
+
+from MoneyCsv.parsing import DataFolder
+from MoneyCsv.filters import *
+from MoneyCsv.statistics import *
+from MoneyCsv.statistics.chart_rendering import CHART_CACHE
+from MoneyCsv.utils import re_exact
+
+# a benchmark is slower than the baseline if it took more than (1 + threshold) times the baseline
+DEFAULT_REGRESSION_THRESHOLD = 0.2
+DEFAULT_REPEAT = 3
+
+
+def measure(func, repeat=DEFAULT_REPEAT):
+	"""
+	returns the best wall time (in seconds) out of `repeat` runs
+	"""
+	best = float("inf")
+
+	for _ in range(repeat):
+		gc.collect()
+		start = time.perf_counter()
+		func()
+		best = min(best, time.perf_counter() - start)
+
+	return best
+
+
+#
+# Benchmarks
+#
+def _filter_benchmarks(data):
+	filters = {
+		"DescriptionFilter"      : DescriptionFilter("pizza"),
+		"DescriptionFilter_regex": DescriptionFilter("p.zza", regex=True),
+		"GroupFilter"            : GroupFilter("Food"),
+		"GroupFilter_exact"      : GroupFilter(re_exact("Food"), case_sensitive=True, regex=True),
+		"FriendFilter"           : FriendFilter("Alice"),
+		"CurrencyFilter"         : CurrencyFilter("euro"),
+		"HasLocationFilter"      : HasLocationFilter(),
+		"LocationFilter"         : LocationFilter("beach"),
+		"HasExtraDetailsFilter"  : HasExtraDetailsFilter(),
+		"ExtraDetailsFilter"     : ExtraDetailsFilter("size"),
+		"ExtraDetailsValueFilter": ExtraDetailsValueFilter("large", "size"),
+		"AmountFilter"           : AmountFilter("<100"),
+		"StrFilter"              : StrFilter("Food"),
+		"AutoFilter"             : AutoFilter("with Alice and Bob"),
+		"TimeFilter_Month"       : TimeFilter_Month(1),
+		"TimeFilter_Year"        : TimeFilter_Year(2010),
+		"TimeFilter_Days"        : TimeFilter_Days(365),
+		"filter_food"            : filter_food,
+		"filter_shopping"        : filter_shopping,
+		"filter_self_gifts"      : filter_self_gifts,
+	}
+
+	return {
+		f"filter/{name}": (lambda f=f: f % data)
+		for name, f in filters.items()
+	}
+
+def _stats_benchmarks(data):
+	params = {
+		"grouping_method": "amount",
+		"sorting_method" : "by_value",
+	}
+
+	stats = {
+		"DetailedStats_AllGroups"          : lambda: DetailedStats_AllGroups(data, **params),
+		"DetailedStats_Friend"             : lambda: DetailedStats_Friend(data, **params),
+		"DetailedStats_Location"           : lambda: DetailedStats_Location(data, **params),
+		"DetailedStats_Group"              : lambda: DetailedStats_Group(data, group_name="Food", **params),
+		"DetailedStats_Food"               : lambda: DetailedStats_Food(data, **params),
+		"DetailedStats_Description"        : lambda: DetailedStats_Description(data, description_text="latte", **params),
+		"DetailedStats_ExtraDetail"        : lambda: DetailedStats_ExtraDetail(DescriptionFilter("latte"), data, **params),
+		"DetailedStats_ExtraDetailWithName": lambda: DetailedStats_ExtraDetailWithName(DescriptionFilter("pizza"), "topping", data, **params),
+	}
+
+	benchmarks = {}
+	for name, factory in stats.items():
+		benchmarks[f"stats/{name}"] = (lambda factory=factory: factory().process_data())
+
+	def to_text():
+		return DetailedStats_AllGroups(data, **params).to_text()
+
+	def to_pie():
+		# measure the rendering itself, rather than the chart cache
+		CHART_CACHE.clear()
+		return DetailedStats_AllGroups(data, **params).to_pie(save=True)
+
+	benchmarks["output/to_text"] = to_text
+	benchmarks["output/to_pie"] = to_pie
+
+	return benchmarks
+
+
+def run_benchmarks(folder, repeat=DEFAULT_REPEAT, only=None):
+	"""
+	only: if given, run only the benchmarks whose name contains this string
+	"""
+	results = {}
+	errors = {}
+
+	def run(name, func, repeat=repeat):
+		if only and only not in name:
+			return
+		try:
+			results[name] = measure(func, repeat)
+			print(f"    {name:50s} {results[name]:10.4f}s", file=sys.stderr)
+		except Exception as e:
+			results[name] = None
+			errors[name] = f"{e.__class__.__name__}: {e}"
+			print(f"    {name:50s} {'error':>10s} ({errors[name]})", file=sys.stderr)
+
+	# loading is measured once, since it is the slowest benchmark
+	run("load/DataFolder", lambda: DataFolder(folder), repeat=1)
+
+	data_object = DataFolder(folder)
+	data = data_object.data
+
+	for name, func in _filter_benchmarks(data).items():
+		run(name, func)
+	for name, func in _stats_benchmarks(data).items():
+		run(name, func)
+
+	return {
+		"meta": {
+			"folder"  : folder,
+			"rows"    : len(data),
+			"files"   : len(data_object.data_files),
+			"python"  : platform.python_version(),
+			"platform": platform.platform(),
+			"time"    : time.strftime("%Y/%m/%d %H:%M:%S"),
+		},
+		"results": results,
+		"errors" : errors,
+	}
+
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_REGRESSION_THRESHOLD):
+	"""
+	returns a list of (name, baseline seconds, current seconds, ratio) of the regressed benchmarks
+	a benchmark which passed in the baseline and errors now is a regression, with None as its seconds & ratio
+	"""
+	regressions = []
+
+	for name, seconds in results["results"].items():
+		baseline_seconds = baseline["results"].get(name)
+		if not baseline_seconds:
+			continue
+
+		if seconds is None:
+			regressions.append((name, baseline_seconds, None, None))
+			continue
+
+		ratio = seconds / baseline_seconds
+		if ratio > 1 + threshold:
+			regressions.append((name, baseline_seconds, seconds, ratio))
+
+	return regressions
+
+
+def load_results(path):
+	with open(path) as handle:
+		return json.load(handle)
+
+def save_results(results, path):
+	with open(path, "w") as handle:
+		json.dump(results, handle, indent=4, sort_keys=True)
@@ -1,18 +1,62 @@
 #!/usr/bin/rlwrap python3
+import sys
+
 from MoneyCsv.cli.parse_args import parse_args
-from MoneyCsv.cli.data import get_special_text, get_extra_details_text, get_search_filter_text, \
-							  open_data_file, get_data
+from MoneyCsv.cli.data import get_stats, get_text, open_data_file, get_data
+from MoneyCsv.cli.daemon import serve
+from MoneyCsv.cli.repl import run_repl
+from MoneyCsv.cli.profiling import StageProfiler, cprofile_to_file
+from MoneyCsv.cli.memory_report import memory_report
+from MoneyCsv.cli.result_cache import ResultCache, is_cacheable, result_key
 
-def main(data_object=None, args_list=None):
+# cache is used by the interactive mode (see cli/repl.py)
+# stream is a file object (e.g. sys.stdout) to which long outputs are written incrementally
+# 	in that case, None is returned
+# the text output of a standalone run is cached on disk (see cli/result_cache.py)
+# 	the daemon, the interactive mode & the telegram bot pass a data_object, and have their own caches
+def main(data_object=None, args_list=None, cache=None, stream=None):
 	args = parse_args(args_list=args_list)
 
-	data_object = open_data_file(data_object, args.file)
+	if args.daemon:
+		return serve(args.file, args.socket_path)
+
+	if args.interactive:
+		return run_repl(args.file)
+
+	if args.memory_report:
+		return memory_report(args.file)
+
+	profiler = StageProfiler()
+
+	if data_object is None and cache is None and is_cacheable(args):
+		return ResultCache().get_or_compute(
+			result_key(args),
+			lambda: run_query(data_object, args, cache, profiler),
+		)
+
+	with cprofile_to_file(args.profile_dump):
+		result = run_query(data_object, args, cache, profiler, stream)
+
+	if args.profile:
+		print(profiler.to_text(), file=sys.stderr)
+
+	return result
+
+def run_query(data_object, args, cache, profiler, stream=None):
+	with profiler.stage("open_data_file") as stage:
+		data_object = open_data_file(data_object, args.file)
+		stage.rows = len(data_object.data)
+
+	with profiler.stage("get_data") as stage:
+		data, time_filter, search_filter = get_data(data_object, args, cache)
+		stage.rows = len(data)
 
-	data, time_filter, search_filter = get_data(data_object, args)
+	with profiler.stage("stats") as stage:
+		g = get_stats(data, time_filter, search_filter, args, cache)
+		# stats objects process the data lazily. processing here separates it from the rendering
+		if hasattr(g, "process_data") and not hasattr(g, "titles_sorted"):
+			g.process_data()
+		stage.rows = len(g.data)
 
-	if search_filter is None:
-		return get_special_text(data, time_filter, args)
-	elif search_filter is not None and args.extra_details:
-		return get_extra_details_text(data, time_filter, search_filter, args)
-	else:
-		return get_search_filter_text(data, time_filter, search_filter, args)
+	with profiler.stage("get_text"):
+		return get_text(g, args, stream)
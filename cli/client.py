@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import socket
+
+# A thin client for the query daemon (cli/daemon.py)
+# 	it only uses the standard library, since importing MoneyCsv pulls in matplotlib & numpy
+# 	thus, prefer running this file directly over `python -m MoneyCsv.cli.client`
+#
+# usage:
+# 	python -m MoneyCsv --daemon [--folder ...]     # start the daemon
+# 	cli/client.py [regular MoneyCsv arguments]     # query it
+
+# should be the same as MoneyCsv.consts.DAEMON_SOCKET_PATH
+DAEMON_SOCKET_PATH = os.environ.get(
+	"MONEYCSV_SOCKET",
+	os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/tmp"), "MoneyCsv.sock")
+)
+
+def query(args_list, socket_path=DAEMON_SOCKET_PATH):
+	with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+		s.connect(socket_path)
+		s.sendall(json.dumps({"args": args_list}).encode() + b"\n")
+
+		with s.makefile("rb") as handle:
+			response = json.loads(handle.readline())
+
+	if "error" in response:
+		raise ValueError(response["error"])
+
+	return response["output"]
+
+def main(args_list=None):
+	if args_list is None:
+		args_list = sys.argv[1:]
+
+	try:
+		return query(args_list)
+	except (FileNotFoundError, ConnectionRefusedError):
+		# no daemon is running - answer the query in this process
+		from MoneyCsv.cli.cli import main as local_main
+		return local_main(args_list=args_list, stream=sys.stdout)
+
+if __name__ == '__main__':
+	try:
+		result = main()
+		# None means the output was already written to stdout
+		if result is not None:
+			print(result)
+	except ValueError as e:
+		print(f"[!] {e}", file=sys.stderr)
+		sys.exit(1)
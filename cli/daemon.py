@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import socket
+import threading
+import socketserver
+
+from MoneyCsv.consts import DAEMON_SOCKET_PATH, DAEMON_WATCH_INTERVAL_IN_SECONDS
+from MoneyCsv.cli.data import open_data_file, resolve_data_path
+from MoneyCsv.cli.parse_args import build_parser
+
+# A resident query daemon
+# 	keeps the data object loaded (and its caches warm), and answers `cli.main` queries over a unix socket
+#
+# protocol (one json object per line):
+# 	request : {"args": ["--all", "--year", "2020"]}
+# 	response: {"output": "..."} or {"error": "..."}
+
+def _remove_stale_socket(socket_path):
+	"""
+	removes a leftover socket of a previous daemon
+	raises if a running daemon still listens on it
+	"""
+	if not os.path.exists(socket_path):
+		return
+
+	with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+		try:
+			s.connect(socket_path)
+		except ConnectionRefusedError:
+			os.unlink(socket_path)
+			return
+
+	raise ValueError(f"a daemon is already listening on {socket_path}")
+
+
+class QueryHandler(socketserver.StreamRequestHandler):
+	def handle(self):
+		line = self.rfile.readline()
+		if not line:
+			return
+
+		try:
+			request = json.loads(line)
+			response = {"output": self.server.query(request["args"])}
+		except SystemExit:
+			# argparse exits on invalid arguments
+			response = {"error": "invalid arguments"}
+		except Exception as e:
+			response = {"error": f"{e.__class__.__name__}: {e}"}
+
+		self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class QueryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+	daemon_threads = True
+
+	def __init__(self, file_path, socket_path=DAEMON_SOCKET_PATH, watch_interval=DAEMON_WATCH_INTERVAL_IN_SECONDS):
+		self._file_path = file_path
+		self._socket_path = socket_path
+		self._watch_interval = watch_interval
+
+		_remove_stale_socket(socket_path)
+
+		self._load()
+
+		super().__init__(socket_path, QueryHandler)
+
+	def __repr__(self):
+		return "%s : %s : %s" % (
+			self.__class__.__name__,
+			self._socket_path,
+			self.data_object,
+		)
+
+	def _load(self):
+		# the new data object is fully built before replacing the old one
+		# 	thus queries which are already running keep using a consistent object
+		data_object = open_data_file(None, self._file_path)
+		self._manifest = data_object.manifest()
+		self.data_object = data_object
+
+	#
+	# Watching for changes
+	#
+	def _watch(self):
+		while True:
+			time.sleep(self._watch_interval)
+
+			try:
+				if self.data_object.manifest() != self._manifest:
+					self._load()
+					print(f"[*] reloaded : {self.data_object}\t{time.asctime()}")
+			except Exception as e:
+				print(f"[!] reload failed : {e}\t{time.asctime()}")
+
+	def start_watching(self):
+		threading.Thread(target=self._watch, daemon=True).start()
+
+	#
+	# Queries
+	#
+	def _check_file(self, args_list):
+		"""
+		raises if the query asks for a file/folder other than the one served by the daemon
+			(the last --file wins, thus a --file of the client overrides the one of the daemon)
+		"""
+		file_path = build_parser().parse_args(args_list).file
+
+		if file_path == self._file_path:
+			return
+
+		if os.path.realpath(resolve_data_path(file_path)) != os.path.realpath(resolve_data_path(self._file_path)):
+			raise ValueError(f"the daemon serves {self._file_path}, not {file_path}")
+
+	def query(self, args_list):
+		# imported here, since cli.cli imports this module
+		from MoneyCsv.cli.cli import main
+
+		if "--daemon" in args_list:
+			raise ValueError("the daemon is already running")
+
+		# the daemon serves a single file/folder.
+		# 	passing it explicitly keeps the defaults (e.g. the default time filter) the same as a regular run
+		args_list = ["--file", self._file_path] + list(args_list)
+		self._check_file(args_list)
+
+		result = main(
+			data_object=self.data_object,
+			args_list=args_list,
+		)
+
+		if not isinstance(result, str):
+			raise ValueError("only text output is served by the daemon")
+
+		return result
+
+	def serve(self):
+		self.start_watching()
+		print(f"[*] serving : {self}")
+
+		try:
+			self.serve_forever()
+		finally:
+			self.server_close()
+			os.unlink(self._socket_path)
+
+
+def serve(file_path, socket_path=DAEMON_SOCKET_PATH):
+	# headless - interactive plots can not be shown by the daemon
+	import matplotlib
+	matplotlib.use("Agg")
+
+	QueryServer(file_path, socket_path).serve()
@@ -1,58 +1,105 @@
+import io
 import os
+import sys
+import datetime
 
-from MoneyCsv.statistics import *
 from MoneyCsv.utils import print_items, re_exact
 from MoneyCsv.parsing import DataFolder, DataFile
 from MoneyCsv.filters import initialize_time_filter, initialize_search_filter
+from MoneyCsv.consts import DEFAULT_DATA_DIRECTORY
+
+# the statistics (and matplotlib) are imported by the functions which use them,
+# 	thus a query answered by the result cache (see cli/result_cache.py) does not import them
 
 # Find the relative file path (it may be a relative path)
+def resolve_data_path(file_path):
+	if not file_path:
+		raise ValueError(f"file/folder not given")
+
+	file_path = os.path.expanduser(file_path)
+
+	for path in (
+		file_path,
+		# try relative path:
+		os.path.join(os.getcwd(), file_path),
+		# try a path relative to the default directory:
+		os.path.join(DEFAULT_DATA_DIRECTORY, file_path),
+	):
+		if os.path.isfile(path) or os.path.isdir(path):
+			return path
+
+	raise ValueError(f"file/folder not found: {file_path}")
+
 def open_data_file(data_object=None, file_path=None):
 	# this will mostly happen when called from the telegram bot,
 	# 	which already uses a DataFolder
 	if data_object:
 		return data_object
 
-	if not file_path:
-		raise ValueError(f"file/folder not given")
+	path = resolve_data_path(file_path)
 
-	file_path = os.path.expanduser(file_path)
+	if os.path.isfile(path):
+		return DataFile(path)
+	else:
+		return DataFolder(path)
 
-	if os.path.exists(file_path):
-		if os.path.isfile(file_path):
-			return DataFile(file_path)
-		if os.path.isdir(file_path):
-			return DataFolder(file_path)
-
-	# try relative path:
-	elif os.path.exists(rel_path := os.path.join(os.getcwd(), file_path)):
-		if os.path.isfile(rel_path):
-			return DataFile(rel_path)
-		if os.path.isdir(rel_path):
-			return DataFolder(rel_path)
-
-	# try a path relative to the default directory:
-	elif os.path.exists(rel_path := os.path.join(DEFAULT_DATA_DIRECTORY, file_path)):
-		if os.path.isfile(rel_path):
-			return DataFile(rel_path)
-		if os.path.isdir(rel_path):
-			return DataFolder(rel_path)
+# A per-session cache of filtered data & stats objects (used by the interactive mode)
+# 	keys are built from the repr of the filters, thus it is only valid for a single data object,
+# 	and for a single day (since time filters are relative to today)
+# 	the repr of a content filter does not tell whether it is a regex, thus the search keys include `force_regex`
+class QueryCache(object):
+	def __init__(self):
+		self.clear()
+
+	def __repr__(self):
+		return "%s : %d items" % (
+			self.__class__.__name__,
+			len(self._items),
+		)
+
+	def clear(self):
+		self._items = {}
+		self._day = datetime.date.today()
+
+	def get(self, key, factory):
+		if self._day != datetime.date.today():
+			self.clear()
+
+		if key not in self._items:
+			self._items[key] = factory()
+
+		return self._items[key]
+
+def _cached(cache, key, factory):
+	if cache is None:
+		return factory()
+
+	return cache.get(key, factory)
 
-	raise ValueError(f"file/folder not found: {file_path}")
 
 # use the filters & the data_object to filter out the relevant data
-def get_data(data_object, args):
+def get_data(data_object, args, cache=None):
 	# initialize filters
 	time_filter   = initialize_time_filter(args)
 	search_filter = initialize_search_filter(args)
 
-	data = time_filter % data_object.data
+	data = _cached(
+		cache,
+		("data", repr(time_filter)),
+		lambda: time_filter % data_object.data,
+	)
 
 	return data, time_filter, search_filter
 
 
 # telegram helper - return the data in one of the following formats, according to args:
 # 	pie, bar, telegram, text
-def get_text(g, args):
+# stream is an optional file object (e.g. sys.stdout). when given, long outputs are written to it incrementally,
+# 	and None is returned (since there is nothing left to print)
+def get_text(g, args, stream=None):
+	if args.export_format:
+		return export(g, args, stream)
+
 	if args.telegram:
 		if args.pie:
 			return g.to_pie(save=True)
@@ -73,13 +120,70 @@ def get_text(g, args):
 
 		if args.show_items:
 			result += "\n------\n"
-			result += print_items(g.data, ret=True)
+
+			if stream is None:
+				result += print_items(g.data, ret=True)
+			else:
+				stream.write(result)
+				stream_items(g.data, stream, args.export_chunk_size)
+				return None
 
 		return result
 
+def stream_items(items, stream, chunk_size):
+	"""
+	writes the same text as `print_items`, a chunk at a time (followed by a newline)
+	"""
+	for start in range(0, len(items), chunk_size):
+		if start:
+			stream.write('\n')
+		stream.write('\n'.join(i.__repr__() for i in items[start:start+chunk_size]))
+		stream.flush()
+	stream.write('\n')
+	stream.flush()
+
+# handles the 'export' output options
+def export(g, args, stream=None):
+	from MoneyCsv.statistics.exporters import export_items, export_stats
+
+	def write(handle):
+		if args.export_items:
+			return export_items(g.data, handle, args.export_format, args.export_chunk_size)
+		else:
+			return export_stats(g, handle, args.export_format, args.export_chunk_size)
+
+	if args.export_path:
+		with open(os.path.expanduser(args.export_path), "w", newline='') as handle:
+			rows = write(handle)
+		print(f"[*] exported {rows} rows to {args.export_path}", file=sys.stderr)
+		return None if stream is not None else ''
+
+	if stream is not None:
+		write(stream)
+		return None
+
+	# no stream to write to (e.g. the daemon) - return the whole output
+	handle = io.StringIO()
+	write(handle)
+	return handle.getvalue()
+
+
+# returns the stats object which answers the query, according to args
+def get_stats(data, time_filter, search_filter, args, cache=None):
+	if args.pivot:
+		return get_pivot_stats(data, time_filter, search_filter, args, cache)
+	elif search_filter is None:
+		return get_special_stats(data, time_filter, args, cache)
+	elif search_filter is not None and args.extra_details:
+		return get_extra_details_stats(data, time_filter, search_filter, args, cache)
+	else:
+		return get_search_filter_stats(data, time_filter, search_filter, args, cache)
+
 
 # handles the 'special' category of the args, or the default
-def get_special_text(data, time_filter, args):
+def get_special_stats(data, time_filter, args, cache=None):
+	from MoneyCsv.statistics import DetailedStats_Friend, DetailedStats_Location, DetailedStats_Group, DetailedStats_AllGroups
+
 	detailedstats_params = {
 		"time_filter"     : time_filter,
 		"grouping_method" : args.grouping_method,
@@ -108,16 +212,25 @@ def get_special_text(data, time_filter, args):
 		cls = DetailedStats_AllGroups
 
 
-	g = cls(
-		data,
-		**kwargs,
-		**detailedstats_params
+	g = _cached(
+		cache,
+		("stats", cls.__name__, repr(time_filter), args.grouping_method, args.sorting_method, *sorted(kwargs.items())),
+		lambda: cls(
+			data,
+			**kwargs,
+			**detailedstats_params
+		),
 	)
 
-	return get_text(g, args)
+	return g
+
+def get_special_text(data, time_filter, args, cache=None):
+	return get_text(get_special_stats(data, time_filter, args, cache), args)
 
 # handles the 'extra-details' flag
-def get_extra_details_text(data, time_filter, search_filter, args):
+def get_extra_details_stats(data, time_filter, search_filter, args, cache=None):
+	from MoneyCsv.statistics import DetailedStats_ExtraDetail, DetailedStats_ExtraDetailWithName
+
 	detailedstats_params = {
 		"time_filter"        : time_filter,
 		"grouping_method"    : args.grouping_method,
@@ -125,29 +238,71 @@ def get_extra_details_text(data, time_filter, search_filter, args):
 	}
 
 	if args.extra_details_name is None:
-		g = DetailedStats_ExtraDetail(
+		factory = lambda: DetailedStats_ExtraDetail(
 			search_filter,
 			data,
 			**detailedstats_params,
 		)
 	else:
-		g = DetailedStats_ExtraDetailWithName(
+		factory = lambda: DetailedStats_ExtraDetailWithName(
 			search_filter,
 			args.extra_details_name,
 			data,
 			**detailedstats_params,
 		)
 
+	g = _cached(
+		cache,
+		("extra_details", args.extra_details_name, repr(time_filter), repr(search_filter), args.force_regex, args.grouping_method, args.sorting_method),
+		factory,
+	)
+
+	return g
 
-	return get_text(g, args)
+def get_extra_details_text(data, time_filter, search_filter, args, cache=None):
+	return get_text(get_extra_details_stats(data, time_filter, search_filter, args, cache), args)
 
 # handles search_filter
-def get_search_filter_text(data, time_filter, search_filter, args):
-	found_items = search_filter % data
+def get_search_filter_stats(data, time_filter, search_filter, args, cache=None):
+	from MoneyCsv.statistics import BasicStats
+
+	found_items = _cached(
+		cache,
+		("search", repr(time_filter), repr(search_filter), args.force_regex),
+		lambda: search_filter % data,
+	)
 
 	g = BasicStats(
 		found_items,
 		time_filter=time_filter
 	)
 
-	return get_text(g, args)
+	return g
+
+def get_search_filter_text(data, time_filter, search_filter, args, cache=None):
+	return get_text(get_search_filter_stats(data, time_filter, search_filter, args, cache), args)
+
+# handles the 'pivot' flag
+def get_pivot_stats(data, time_filter, search_filter, args, cache=None):
+	from MoneyCsv.statistics import DetailedStats_Pivot
+
+	if search_filter is not None:
+		data = _cached(
+			cache,
+			("search", repr(time_filter), repr(search_filter), args.force_regex),
+			lambda: search_filter % data,
+		)
+
+	g = _cached(
+		cache,
+		("pivot", args.pivot, repr(time_filter), repr(search_filter), args.force_regex, args.grouping_method, args.sorting_method),
+		lambda: DetailedStats_Pivot(
+			data,
+			period          = args.pivot,
+			time_filter     = time_filter,
+			grouping_method = args.grouping_method,
+			sorting_method  = args.sorting_method,
+		),
+	)
+
+	return g
@@ -0,0 +1,192 @@
+import sys
+import tracemalloc
+from collections import defaultdict
+
+from MoneyCsv.cli.data import open_data_file
+
+# amount of allocation sites shown in the report
+DEFAULT_TOP_ALLOCATIONS = 15
+
+
+def format_size(size):
+	for unit in ("B", "KB", "MB"):
+		if abs(size) < 1024:
+			return f"{size:.1f} {unit}" if unit != "B" else f"{size} {unit}"
+		size /= 1024
+	return f"{size:.1f} GB"
+
+
+#
+# Object size accounting
+#
+def deep_sizeof(obj, seen):
+	"""
+	the size of obj, and of every object it refers to
+	seen holds the ids of the objects which were already counted
+		thus shared objects (e.g. the headers list of a file, interned strings) are counted once
+	"""
+	if id(obj) in seen:
+		return 0
+	seen.add(id(obj))
+
+	size = sys.getsizeof(obj)
+
+	if isinstance(obj, dict):
+		size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+	elif isinstance(obj, (list, tuple, set, frozenset)):
+		size += sum(deep_sizeof(i, seen) for i in obj)
+	elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+		size += deep_sizeof(obj.__dict__, seen)
+
+	return size
+
+def field_sizes(data, seen):
+	"""
+	attributes the memory of a list of DataItems to their fields
+		"DataItem" is the objects themselves (including their attribute dicts)
+		"_items" is counted last, thus it shows only what it does not share with the attributes
+	returns a dict of {field name : size}
+	"""
+	fields = defaultdict(int)
+
+	for item in data:
+		attributes = vars(item)
+
+		seen.add(id(item))
+		seen.add(id(attributes))
+		fields["DataItem"] += sys.getsizeof(item) + sys.getsizeof(attributes)
+
+		for name, value in attributes.items():
+			if name != "_items":
+				fields[name] += deep_sizeof(value, seen)
+
+		if "_items" in attributes:
+			fields["_items"] += deep_sizeof(attributes["_items"], seen)
+
+	return fields
+
+
+#
+# Report
+#
+class MemoryReport(object):
+	"""
+	loads a data file/folder while tracing the allocations, and then accounts for the loaded objects
+
+	usage:
+		print(MemoryReport(path).to_text())
+	"""
+	def __init__(self, file_path, top=DEFAULT_TOP_ALLOCATIONS):
+		self.top = top
+
+		was_tracing = tracemalloc.is_tracing()
+		if not was_tracing:
+			tracemalloc.start()
+		tracemalloc.reset_peak()
+
+		self.data_object = open_data_file(None, file_path)
+
+		self.traced, self.traced_peak = tracemalloc.get_traced_memory()
+		self.allocations = tracemalloc.take_snapshot().filter_traces((
+			tracemalloc.Filter(False, tracemalloc.__file__),
+		)).statistics("lineno")
+
+		if not was_tracing:
+			tracemalloc.stop()
+
+		self._account()
+
+	def _data_files(self):
+		# a DataFile is reported as a folder with a single file
+		return getattr(self.data_object, "data_files", [self.data_object])
+
+	def _account(self):
+		seen = set()
+
+		# file name -> (rows, {field : size})
+		self.files = {}
+		self.fields = defaultdict(int)
+
+		for data_file in self._data_files():
+			fields = field_sizes(data_file.data, seen)
+
+			# the lists which the file holds on top of its items
+			fields["DataFile lists"] += sum(
+				deep_sizeof(getattr(data_file, name), seen)
+				for name in ("data", "headers", "titles", "friends", "friends_histogram", "locations", "locations_histogram")
+				if hasattr(data_file, name)
+			)
+
+			self.files[data_file._path] = (len(data_file.data), fields)
+			for name, size in fields.items():
+				self.fields[name] += size
+
+		if self.data_object not in self._data_files():
+			# the concatenated lists of a DataFolder
+			self.fields["DataFolder lists"] += sum(
+				deep_sizeof(getattr(self.data_object, name), seen)
+				for name in ("data", "titles", "friends", "locations")
+			)
+
+		self.total = sum(self.fields.values())
+
+	def _files_text(self):
+		name_width = max(len(path) for path in self.files)
+
+		s  = f"    {'File':{name_width}s} {'rows':>10s} {'size':>12s} {'per row':>10s}"
+		s += "\n"
+		s += "    " + '-' * (name_width + 36)
+
+		for path, (rows, fields) in self.files.items():
+			size = sum(fields.values())
+			s += "\n"
+			s += f"    {path:{name_width}s} {rows:10d} {format_size(size):>12s} {(size // rows if rows else 0):8d} B"
+
+		return s
+
+	def _fields_text(self):
+		name_width = max(len(name) for name in self.fields)
+
+		s  = f"    {'Field':{name_width}s} {'size':>12s} {'%':>7s}"
+		s += "\n"
+		s += "    " + '-' * (name_width + 22)
+
+		for name, size in sorted(self.fields.items(), key=lambda x: x[1], reverse=True):
+			s += "\n"
+			s += f"    {name:{name_width}s} {format_size(size):>12s} {(size / self.total * 100 if self.total else 0):6.1f}%"
+
+		s += "\n"
+		s += "    " + '-' * (name_width + 22)
+		s += "\n"
+		s += f"    {'Total':{name_width}s} {format_size(self.total):>12s}"
+		return s
+
+	def _allocations_text(self):
+		s  = f"    {'size':>12s} {'count':>10s}  location"
+		s += "\n"
+		s += "    " + '-' * 60
+
+		for stat in self.allocations[:self.top]:
+			frame = stat.traceback[0]
+			s += "\n"
+			s += f"    {format_size(stat.size):>12s} {stat.count:10d}  {frame.filename}:{frame.lineno}"
+
+		return s
+
+	def to_text(self):
+		return '\n'.join([
+			f"Memory report : {self.data_object}",
+			f"    traced while loading : {format_size(self.traced)} (peak {format_size(self.traced_peak)})",
+			"",
+			"Per file:",
+			self._files_text(),
+			"",
+			"Per field:",
+			self._fields_text(),
+			"",
+			f"Top {self.top} allocation sites while loading:",
+			self._allocations_text(),
+		])
+
+def memory_report(file_path, top=DEFAULT_TOP_ALLOCATIONS):
+	return MemoryReport(file_path, top).to_text()
@@ -1,7 +1,7 @@
 import sys
 import argparse
 
-from MoneyCsv.consts import DEFAULT_DATA_DIRECTORY
+from MoneyCsv.consts import DEFAULT_DATA_DIRECTORY, DAEMON_SOCKET_PATH, EXPORT_CHUNK_SIZE
 
 try:
 	from MoneyCsv.tests import test
@@ -9,8 +9,13 @@ except ImportError:
 	def test(*args, **kwargs):
 		print("no `tests` file found")
 
-# may pass arguments as a list (used in the telegram bot)
-def parse_args(args_list=None):
+def positive_int(value):
+	n = int(value)
+	if n < 1:
+		raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+	return n
+
+def build_parser():
 	parser = argparse.ArgumentParser()
 	parser.add_argument("--file", "--folder", "-f", type=str, default=DEFAULT_DATA_DIRECTORY, dest="file", help="which file/folder to read")
 
@@ -38,6 +43,9 @@ def parse_args(args_list=None):
 	debugging.add_argument("--debug", action="store_true")
 	debugging.add_argument("--test" , action="store_true")
 	debugging.add_argument("--pdb"  , action="store_true")
+	debugging.add_argument("--profile"     , action="store_true"    , dest="profile"     , help="print the time spent in each stage of the query")
+	debugging.add_argument("--profile-dump", type=str , default=None, dest="profile_dump", help="write cProfile stats to this path (read it with `python -m pstats`)")
+	debugging.add_argument("--memory-report", action="store_true"  , dest="memory_report", help="report the memory used by the loaded data, per file, per field and per allocation site")
 
 	grouping = parser.add_argument_group("grouping")
 	grouping.add_argument("--all-groups", "--all", action="store_true"    , dest="all_groups"  , help="show statistics of all groups")
@@ -46,6 +54,7 @@ def parse_args(args_list=None):
 	grouping.add_argument("--location"           , action="store_true"    , dest="location"    , help="show location statistics")
 	#
 	grouping.add_argument("--food"               , action="store_true"    , dest="food"        , help="show food statistics")
+	grouping.add_argument("--pivot"              , type=str , default=None, dest="pivot"       , choices=("week", "month", "year"), help="show a group x period table (of the search results, if given)")
 
 	details = parser.add_argument_group("details")
 	details.add_argument("--extra-details", "--extra", action="store_true",     dest="extra_details"     , help="extra details within the search filter")
@@ -55,7 +64,26 @@ def parse_args(args_list=None):
 	output.add_argument("--telegram", action="store_true")
 	output.add_argument("--pie"     , action="store_true")
 	output.add_argument("--bar"     , action="store_true")
+	output.add_argument("--no-cache", action="store_true", dest="no_cache", help="do not use the on-disk result cache (see cli/result_cache.py)")
+
+	export = parser.add_argument_group("export")
+	export.add_argument("--export"           , type=str , default=None             , dest="export_format"    , choices=("csv", "jsonl", "ndjson"), help="stream the statistics (or the items) in this format, rather than as text")
+	export.add_argument("--export-items"     , action="store_true"                 , dest="export_items"     , help="export the items, rather than the statistics")
+	export.add_argument("--export-path"      , type=str , default=None             , dest="export_path"      , help="export to this file (default: stdout)")
+	export.add_argument("--export-chunk-size", type=positive_int, default=EXPORT_CHUNK_SIZE, dest="export_chunk_size", help="amount of rows written at once")
+
+	daemon = parser.add_argument_group("daemon")
+	daemon.add_argument("--daemon", action="store_true"                     , dest="daemon"     , help="keep the data loaded, and answer queries over a unix socket (see cli/client.py)")
+	daemon.add_argument("--socket", type=str, default=DAEMON_SOCKET_PATH, dest="socket_path", help="the unix socket of the daemon")
 
+	interactive = parser.add_argument_group("interactive")
+	interactive.add_argument("--interactive", "-i", action="store_true", dest="interactive", help="load the data once, and read queries (in the same syntax) line by line")
+
+	return parser
+
+# may pass arguments as a list (used in the telegram bot)
+def parse_args(args_list=None):
+	parser = build_parser()
 
 	if args_list is None:
 		args = parser.parse_args()
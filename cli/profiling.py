@@ -0,0 +1,97 @@
+import sys
+import time
+import cProfile
+import contextlib
+
+
+class Stage(object):
+	def __init__(self, name):
+		self.name = name
+		# the amount of rows this stage ended up with (set by the caller)
+		self.rows = None
+
+		self.wall = 0
+		self.cpu = 0
+
+
+class StageProfiler(object):
+	"""
+	records the wall & cpu time of each stage of a query
+
+	usage:
+		with profiler.stage("get_data") as stage:
+			data = ...
+			stage.rows = len(data)
+
+		print(profiler.to_text())
+	"""
+	def __init__(self):
+		self.stages = []
+
+	@contextlib.contextmanager
+	def stage(self, name):
+		stage = Stage(name)
+
+		wall = time.perf_counter()
+		cpu = time.process_time()
+		try:
+			yield stage
+		finally:
+			stage.wall = time.perf_counter() - wall
+			stage.cpu = time.process_time() - cpu
+			self.stages.append(stage)
+
+	@property
+	def total_wall(self):
+		return sum(s.wall for s in self.stages)
+
+	@property
+	def total_cpu(self):
+		return sum(s.cpu for s in self.stages)
+
+	def to_text(self):
+		title_format = "%%-%ds" % (max((len(s.name) for s in self.stages), default=5) + 1)
+
+		s  = "    %s %10s %10s %10s %7s" % (title_format % "Stage", "wall (ms)", "cpu (ms)", "rows", "wall %")
+		s += "\n"
+		s += "    " + '-'*50
+
+		for stage in self.stages:
+			s += "\n"
+			s += "    %s %10.2f %10.2f %10s %6.1f%%" % (
+				title_format % stage.name,
+				stage.wall * 1000,
+				stage.cpu * 1000,
+				'' if stage.rows is None else stage.rows,
+				(stage.wall / self.total_wall * 100) if self.total_wall else 0,
+			)
+
+		s += "\n"
+		s += "    " + '-'*50
+		s += "\n"
+		s += "    %s %10.2f %10.2f" % (
+			title_format % "Total",
+			self.total_wall * 1000,
+			self.total_cpu * 1000,
+		)
+		return s
+
+
+@contextlib.contextmanager
+def cprofile_to_file(path):
+	"""
+	runs cProfile, and dumps the stats to `path` (if path is None - does nothing)
+	the result can be read using `python -m pstats <path>`
+	"""
+	if path is None:
+		yield
+		return
+
+	profile = cProfile.Profile()
+	profile.enable()
+	try:
+		yield
+	finally:
+		profile.disable()
+		profile.dump_stats(path)
+		print(f"[*] cProfile stats written to {path}", file=sys.stderr)
@@ -0,0 +1,128 @@
+import os
+import sys
+import cmd
+import shlex
+import readline
+
+from MoneyCsv.cli.parse_args import build_parser
+from MoneyCsv.cli.data import open_data_file, QueryCache
+
+HISTORY_FILE = os.path.expanduser("~/.MoneyCsv_history")
+
+class MoneyCsvShell(cmd.Cmd):
+	"""
+	every line is parsed the same as the command line arguments, e.g.:
+		--all --year 2020
+		--group Food --extra
+	the data is loaded once, and filtered data & stats objects are cached across queries
+
+	special commands:
+		reload - reload the data & clear the cache
+		quit / exit / EOF (ctrl+d)
+	"""
+	prompt = "MoneyCsv> "
+	intro = "Type queries in the command line syntax. 'help' for more info, 'quit' to exit."
+
+	def __init__(self, file_path):
+		super().__init__()
+
+		self._file_path = file_path
+		self._option_strings = sorted(build_parser()._option_string_actions)
+		# '@' is used for locations, '-' for options
+		readline.set_completer_delims(" \t\n\"'")
+
+		self.do_reload()
+
+	#
+	# Commands
+	#
+	def do_reload(self, line=''):
+		"reload the data & clear the cache"
+		self.data_object = open_data_file(None, self._file_path)
+		self.cache = QueryCache()
+		print(f"[*] loaded : {self.data_object}")
+
+	def do_quit(self, line=''):
+		"exit the interactive mode"
+		return True
+	do_exit = do_quit
+
+	def do_EOF(self, line=''):
+		print()
+		return True
+
+	def do_help(self, line=''):
+		print(self.__doc__)
+
+	def emptyline(self):
+		# do not repeat the last query
+		pass
+
+	def default(self, line):
+		# imported here, since cli.cli imports this module
+		from MoneyCsv.cli.cli import main
+
+		try:
+			args_list = shlex.split(line)
+
+			if "--interactive" in args_list or "-i" in args_list:
+				raise ValueError("already in interactive mode")
+
+			result = main(
+				data_object=self.data_object,
+				# passing the file explicitly keeps the defaults the same as a regular run
+				args_list=["--file", self._file_path] + args_list,
+				cache=self.cache,
+				stream=sys.stdout,
+			)
+		except SystemExit:
+			# argparse exits on invalid arguments (and on --help)
+			return
+		except Exception as e:
+			print(f"[!] {e.__class__.__name__}: {e}")
+			return
+
+		if result:
+			print(result)
+
+	#
+	# Completion
+	#
+	def _candidates(self, text, previous_word):
+		if previous_word == "--group":
+			return self.data_object.titles
+		if text.startswith('-'):
+			return self._option_strings
+		if text.startswith('@'):
+			return [f"@{location}@" for location in self.data_object.locations]
+
+		return self.data_object.titles + self.data_object.friends
+
+	def completedefault(self, text, line, begidx, endidx):
+		words = line[:begidx].split()
+		previous_word = words[-1] if words else None
+
+		return [
+			c
+			for c in self._candidates(text, previous_word)
+			if c.startswith(text)
+		]
+
+	def completenames(self, text, line, begidx, endidx):
+		# the first word of a line is usually a query, not a command
+		return super().completenames(text, line, begidx, endidx) + self.completedefault(text, line, begidx, endidx)
+
+	#
+	# History
+	#
+	def preloop(self):
+		if os.path.exists(HISTORY_FILE):
+			readline.read_history_file(HISTORY_FILE)
+
+	def postloop(self):
+		readline.write_history_file(HISTORY_FILE)
+
+
+def run_repl(file_path):
+	MoneyCsvShell(file_path).cmdloop()
+	return ''
@@ -0,0 +1,208 @@
+import os
+import hashlib
+import datetime
+import tempfile
+
+from MoneyCsv.utils import get_files_manifest
+from MoneyCsv.consts import RESULT_CACHE_DIRECTORY, RESULT_CACHE_MAX_BYTES, FIXED_POINT_AMOUNTS
+from MoneyCsv.parsing.parsing import get_data_manifest
+from MoneyCsv.parsing.currency_conversion import get_rates_manifest
+from MoneyCsv.filters import initialize_time_filter
+from MoneyCsv.cli.data import resolve_data_path
+
+# An on-disk cache of the rendered output of CLI queries
+# 	the same queries are run over and over against unchanged data, thus a repeated query only reads a file
+#
+# the key of a result is a hash of:
+# 	the args namespace (without the args which do not change the output - see NON_KEY_ARGS)
+# 	the time window (the repr of the time filter, and today - since some time filters are relative to today)
+# 	the manifests (path, size, mtime) of the data files, of the rates files & of the source files of the package
+# thus a result is never invalidated explicitly - a modified file simply leads to a different key
+#
+# each result is a file in RESULT_CACHE_DIRECTORY, and its mtime is the time of its last use
+# 	the least recently used results are removed once the total size exceeds RESULT_CACHE_MAX_BYTES
+
+# bumped whenever the format of the cached results changes
+# 	(a change of the code which renders them is already a part of the key - see get_source_manifest)
+RESULT_CACHE_FORMAT_VERSION = 1
+
+PACKAGE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+NON_KEY_ARGS = {
+	"debug", "test", "pdb",
+	"profile", "profile_dump", "memory_report",
+	"daemon", "socket_path", "interactive",
+	"export_chunk_size", "no_cache",
+}
+
+RESULT_FILE_EXTENSION = ".txt"
+
+
+def is_cacheable(args):
+	"""
+	only text outputs are cached
+	charts are shown (or saved), exports may be written to a file, and long outputs are streamed
+	profiling measures the query itself
+	"""
+	return not any((
+		args.no_cache,
+		args.pie,
+		args.bar,
+		args.export_format,
+		args.show_items,
+		args.profile,
+		args.profile_dump,
+	))
+
+def get_source_manifest(package_directory=PACKAGE_DIRECTORY):
+	"""
+	changes whenever a source file of the package is added, removed or modified
+	"""
+	return get_files_manifest(
+		os.path.join(root, name)
+		for root, _, names in os.walk(package_directory)
+		for name in names
+		if name.endswith(".py")
+	)
+
+def result_key(args):
+	path = os.path.abspath(resolve_data_path(args.file))
+
+	# the args are normalized before the time filter is built (it may set a default value in args)
+	normalized_args = sorted(
+		(k, v)
+		for k, v in vars(args).items()
+		if k not in NON_KEY_ARGS and k != "file"
+	)
+	time_filter = initialize_time_filter(args)
+
+	key = repr((
+		RESULT_CACHE_FORMAT_VERSION,
+		FIXED_POINT_AMOUNTS,
+		path,
+		normalized_args,
+		repr(time_filter),
+		datetime.date.today(),
+		get_data_manifest(path),
+		get_rates_manifest(),
+		get_source_manifest(),
+	))
+
+	return hashlib.sha256(key.encode()).hexdigest()
+
+
+class ResultCache(object):
+	def __init__(self, directory=RESULT_CACHE_DIRECTORY, max_bytes=RESULT_CACHE_MAX_BYTES):
+		self._directory = os.path.expanduser(directory)
+		self.max_bytes = max_bytes
+
+		self.hits = 0
+		self.misses = 0
+
+	def __repr__(self):
+		return "%s : %s : %d items" % (
+			self.__class__.__name__,
+			self._directory,
+			len(self._entries()),
+		)
+
+	def _path(self, key):
+		return os.path.join(self._directory, key + RESULT_FILE_EXTENSION)
+
+	def _entries(self):
+		"""
+		returns a list of (mtime, size, path), the least recently used first
+		"""
+		entries = []
+
+		try:
+			names = os.listdir(self._directory)
+		except FileNotFoundError:
+			return entries
+
+		for name in names:
+			if not name.endswith(RESULT_FILE_EXTENSION):
+				continue
+
+			path = os.path.join(self._directory, name)
+			try:
+				stat = os.stat(path)
+			except FileNotFoundError:
+				# evicted by another process
+				continue
+			entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+		return sorted(entries)
+
+	def get(self, key):
+		"""
+		returns None on a miss
+		"""
+		path = self._path(key)
+
+		try:
+			with open(path, encoding="utf-8", newline='') as handle:
+				result = handle.read()
+		except FileNotFoundError:
+			self.misses += 1
+			return None
+
+		# mark it as recently used
+		try:
+			os.utime(path)
+		except OSError:
+			pass
+
+		self.hits += 1
+		return result
+
+	def put(self, key, result):
+		data = result.encode("utf-8")
+
+		# never cache an item which alone exceeds the limit
+		if len(data) > self.max_bytes:
+			return
+
+		# the cache is an optimization - a failure to write it does not fail the query
+		try:
+			os.makedirs(self._directory, exist_ok=True)
+
+			# written aside and renamed, thus other processes never read a partial result
+			fd, temp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+			with os.fdopen(fd, "wb") as handle:
+				handle.write(data)
+			os.replace(temp_path, self._path(key))
+
+			self._evict()
+		except OSError:
+			pass
+
+	def _evict(self):
+		entries = self._entries()
+		size = sum(e[1] for e in entries)
+
+		for _, entry_size, path in entries:
+			if size <= self.max_bytes:
+				break
+
+			try:
+				os.unlink(path)
+			except FileNotFoundError:
+				pass
+			size -= entry_size
+
+	def clear(self):
+		for _, _, path in self._entries():
+			try:
+				os.unlink(path)
+			except FileNotFoundError:
+				pass
+
+	def get_or_compute(self, key, factory):
+		result = self.get(key)
+		if result is None:
+			result = factory()
+			if isinstance(result, str):
+				self.put(key, result)
+
+		return result
@@ -6,9 +6,73 @@ import datetime
 #
 DEFAULT_DATA_DIRECTORY = os.path.expanduser("~/Dropbox/Projects/MoneyCsv/data/by_type")
 POSSIBLE_FILE_EXTENSIONS = [".mcsv", ".csv", ".txt", ""]
-# temporary files
-DEFAULT_PIE_PATH = "/tmp/pie.png"
-DEFAULT_BAR_PATH = "/tmp/bar.png"
+# exchange rate tables - one csv per currency (see parsing/currency_conversion.py)
+DEFAULT_RATES_DIRECTORY = os.environ.get(
+	"MONEYCSV_RATES_DIRECTORY",
+	os.path.expanduser("~/Dropbox/Projects/MoneyCsv/data/rates")
+)
+
+
+#
+# Charts
+#
+# rendered charts are cached in memory (as png bytes)
+CHART_CACHE_MAX_BYTES = 32 * 1024 * 1024
+CHART_CACHE_MAX_ITEMS = 128
+# amount of worker processes rendering charts in the background (used by the telegram bot)
+RENDER_POOL_WORKERS = 2
+
+
+#
+# Daemon
+#
+# the query daemon listens on this unix socket (see cli/daemon.py and cli/client.py)
+DAEMON_SOCKET_PATH = os.environ.get(
+	"MONEYCSV_SOCKET",
+	os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/tmp"), "MoneyCsv.sock")
+)
+# how often the daemon checks whether the data files were modified
+DAEMON_WATCH_INTERVAL_IN_SECONDS = 2
+
+
+#
+# Result cache
+#
+# the rendered output of CLI queries is cached on disk (see cli/result_cache.py)
+RESULT_CACHE_DIRECTORY = os.environ.get(
+	"MONEYCSV_CACHE_DIRECTORY",
+	os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "MoneyCsv", "results")
+)
+# the least recently used results are evicted above this size
+RESULT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+
+#
+# Export
+#
+# the streaming exporters write to their output every this amount of rows
+EXPORT_CHUNK_SIZE = 1000
+
+
+#
+# Amounts
+#
+# store the amounts as int64 minor units (agorot / cents), thus sums are exact (see parsing/fixed_point.py)
+FIXED_POINT_AMOUNTS = os.environ.get("MONEYCSV_FIXED_POINT", '') not in ('', '0')
+MINOR_UNITS_PER_UNIT = 100
+
+
+#
+# Metrics
+#
+# the telegram bot exports its metrics (Prometheus text format) to this path
+METRICS_FILE_PATH = os.environ.get(
+	"MONEYCSV_METRICS_FILE",
+	os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/tmp"), "MoneyCsv.prom")
+)
+METRICS_WRITE_INTERVAL_IN_SECONDS = 30
+# commands which take longer than this are written to the slow-command log
+SLOW_COMMAND_THRESHOLD_IN_SECONDS = float(os.environ.get("MONEYCSV_SLOW_COMMAND_THRESHOLD", 2))
 
 
 #
@@ -25,3 +89,8 @@ WEEK_STARTS_AT_SUNDAY = True
 #
 RETRY_SLEEP_AMOUNT_IN_HOURS = 1
 RETRY_SLEEP_AMOUNT_IN_SECONDS = RETRY_SLEEP_AMOUNT_IN_HOURS * 60 * 60
+#
+# how often the telegram bot checks for pending scheduled commands
+SCHEDULER_INTERVAL_IN_SECONDS = 60
+# the telegram bot's /changes command shows up to this amount of changed rows
+CHANGES_MAX_LINES = 40
@@ -1,9 +1,9 @@
 import operator
-import itertools
 from collections.abc import Iterable
 
 from MoneyCsv.consts import DEFAULT_SELECTED_TIME
-from MoneyCsv.parsing import DataItem
+from MoneyCsv.parsing import DataItem, DataView
+from MoneyCsv.filters.compiler import FilterCompiler, NotCompilable
 
 class Filter(object):
 	def filter(self, data):
@@ -13,7 +13,12 @@ class Filter(object):
 		raise NotImplementedError
 
 	def get_filtered_data(self, data):
-		return list(itertools.compress(data, self.filter(data)))
+		"""
+		returns a DataView of the matching items (see parsing/data_view.py)
+			thus filtering never copies the items, and filtering a view narrows it further
+		data must support len (a list, a tuple or a DataView)
+		"""
+		return DataView.from_mask(data, self.filter(data))
 
 	@property
 	def selected_time(self):
@@ -59,6 +64,35 @@ class Filter(object):
 	def __repr__(self):
 		return self.__class__.__name__
 
+
+def _compiled_predicate(filter_obj):
+	"""
+	compiles a filter tree once (see compiler.py), and caches the resulting predicate on it
+	returns None if the tree can not be compiled
+	"""
+	try:
+		return filter_obj.__dict__["_predicate"]
+	except KeyError:
+		pass
+
+	try:
+		predicate, _ = FilterCompiler().build(filter_obj)
+	except NotCompilable:
+		predicate = None
+
+	filter_obj._predicate = predicate
+	return predicate
+
+def _collapse_or(filter_obj):
+	"""
+	an OR of literal content filters of the same class is matched as a single filter (see multi_pattern.py)
+	returns None if the filters can not be collapsed
+	"""
+	# imported here, since multi_pattern.py imports this module (through content_filters.py)
+	from MoneyCsv.filters.multi_pattern import collapse_or
+
+	return collapse_or(filter_obj)
+
 _OPERATOR_MAP = {
 	"and": operator.and_,
 	"or": operator.or_,
@@ -77,13 +111,48 @@ class MultiFilter(Filter):
 			allowed_operations = ", ".join(map("\"{}\"",format, _OPERATOR_MAP))
 			raise ValueError(f"invalid operation! please use either {allowed_operations}") from exc
 
+	def _get_collapsed(self):
+		"""
+		e.g. `GroupFilter("Coffee") | GroupFilter("Food")`, or a whole `join_filters_with_or`
+		collapsed on first use, thus building a long OR chain (a MultiFilter per step) does not collapse every step
+		"""
+		if not hasattr(self, "_collapsed"):
+			self._collapsed = _collapse_or(self) if self.operator is operator.or_ else None
+		return self._collapsed
+
 	def filter(self, data):
+		collapsed = self._get_collapsed()
+		if collapsed is not None:
+			return collapsed.filter(data)
+
+		# the whole tree is evaluated by a single compiled function, with a single call per row
+		predicate = _compiled_predicate(self)
+		if predicate is not None:
+			return map(predicate, data)
+
+		return self._filter_tree(data)
+
+	def _filter_tree(self, data):
 		return map(
 			self.operator,
 			self.filter_1.filter(data),
 			self.filter_2.filter(data)
 		)
 
+	def _compile(self, compiler):
+		collapsed = self._get_collapsed()
+		if collapsed is not None:
+			return compiler.compile(collapsed)
+
+		a = compiler.compile(self.filter_1)
+		b = compiler.compile(self.filter_2)
+
+		if self.operator is operator.and_:
+			return compiler.and_(a, b)
+		if self.operator is operator.or_:
+			return compiler.or_(a, b)
+		return compiler.xor(a, b)
+
 	def __repr__(self):
 		return f"({repr(self.filter_1)}) {self.operation} ({repr(self.filter_2)})"
 
@@ -117,11 +186,18 @@ class NotFilter(Filter):
 		self.filter_obj = filter_obj
 
 	def filter(self, data):
+		predicate = _compiled_predicate(self)
+		if predicate is not None:
+			return map(predicate, data)
+
 		return map(
 			operator.not_,
 			self.filter_obj.filter(data),
 		)
 
+	def _compile(self, compiler):
+		return compiler.not_(compiler.compile(self.filter_obj))
+
 	def __repr__(self):
 		return f"not ({self.filter_obj.__repr__()})"
 
@@ -129,6 +205,12 @@ class NotFilter(Filter):
 class TrueFilter(Filter):
 	def filter(self, data):
 		return [True] * len(data)
+
+	def _compile(self, compiler):
+		return "True"
 class FalseFilter(Filter):
 	def filter(self, data):
 		return [False] * len(data)
+
+	def _compile(self, compiler):
+		return "False"
@@ -0,0 +1,125 @@
+# Compiles a tree of filters into a single python function
+# 	each filter class implements `_compile(self, compiler)`, which returns a python expression (str)
+# 	of the row variable `i`. the expressions of the whole tree are joined into:
+#
+# 		def predicate(i):
+# 			return <expression>
+#
+# 	constants (strings, dates, compiled regexes, memo tables) are passed as globals of the function,
+# 	and the trivial expressions ("True" / "False") are folded by `and` / `or` / `not`
+#
+# the result of the predicate is the same as the result of the tree evaluation.
+# 	`and` & `or` short-circuit, thus an exception raised by a skipped branch is not raised
+#
+# the trees are compiled by MultiFilter & NotFilter themselves, on their first `filter` call
+# 	(see `_compiled_predicate` in base_filters.py), thus `(a & (b | ~c)) % data` runs the compiled predicate
+
+ROW = 'i'
+
+
+class NotCompilable(Exception):
+	pass
+
+
+class Memo(dict):
+	"""
+	caches the result of a function per distinct value
+	used for fields with few distinct values (e.g. group), thus a regex runs once per group, rather than once per row
+	"""
+	def __init__(self, function):
+		super().__init__()
+		self._function = function
+
+	def __missing__(self, key):
+		value = self[key] = self._function(key)
+		return value
+
+
+class FilterCompiler(object):
+	def __init__(self):
+		self.constants = {}
+
+	def constant(self, value):
+		"""
+		returns the name of a global holding `value`
+		"""
+		name = f"c{len(self.constants)}"
+		self.constants[name] = value
+		return name
+
+	def memoized(self, function, expression):
+		"""
+		returns an expression of the (cached) result of `function(expression)`
+		"""
+		return f"{self.constant(Memo(function))}[{expression}]"
+
+	def compile(self, filter_obj):
+		"""
+		returns the expression of filter_obj
+		"""
+		if hasattr(filter_obj, "_compile"):
+			return filter_obj._compile(self)
+
+		# a filter without a `_compile` hook - call it as is
+		if callable(getattr(filter_obj, "_filter_single_item", None)):
+			return f"{self.constant(filter_obj._filter_single_item)}({ROW})"
+
+		raise NotCompilable(f"cannot compile {filter_obj!r}")
+
+	#
+	# Constant folding
+	#
+	@staticmethod
+	def and_(a, b):
+		if a == "False" or b == "False":
+			return "False"
+		if a == "True":
+			return b
+		if b == "True":
+			return a
+		return f"({a} and {b})"
+
+	@staticmethod
+	def or_(a, b):
+		if a == "True" or b == "True":
+			return "True"
+		if a == "False":
+			return b
+		if b == "False":
+			return a
+		return f"({a} or {b})"
+
+	@staticmethod
+	def xor(a, b):
+		if a in ("True", "False") and b in ("True", "False"):
+			return str(a != b)
+		if a == "False":
+			return b
+		if b == "False":
+			return a
+		return f"({a} != {b})"
+
+	@staticmethod
+	def not_(a):
+		if a == "True":
+			return "False"
+		if a == "False":
+			return "True"
+		return f"(not {a})"
+
+	#
+	# Code generation
+	#
+	def build(self, filter_obj):
+		"""
+		returns (predicate, source)
+		"""
+		expression = self.compile(filter_obj)
+
+		source = f"def predicate({ROW}):\n\treturn {expression}\n"
+
+		namespace = dict(self.constants)
+		exec(compile(source, f"<compiled filter {filter_obj!r}>", "exec"), namespace)
+
+		return namespace["predicate"], source
+
@@ -1,3 +1,4 @@
+import re
 import operator
 
 from MoneyCsv.filters.base_filters import Filter
@@ -40,28 +41,118 @@ class BaseContentFilter(Filter):
 			self.case_sensitive
 		)
 
+	#
+	# Compilation (see compiler.py)
+	#
+	def _compile_find_string_in_string(self, compiler, expression, string_to_find=None):
+		"""
+		the compiled version of `_find_string_in_string(expression)`
+		"""
+		if string_to_find is None:
+			string_to_find = self.string_to_find
+
+		if self.regex:
+			pattern = re.compile(string_to_find, 0 if self.case_sensitive else re.I)
+			return f"({compiler.constant(pattern)}.search({expression}) is not None)"
+
+		if self.case_sensitive:
+			return f"({compiler.constant(string_to_find)} in {expression})"
+		else:
+			return f"({compiler.constant(string_to_find)} in {expression}.lower())"
+
+	def _compile_find_string_in_list(self, compiler, expression, string_to_find=None):
+		"""
+		the compiled version of `_find_string_in_list(expression)`
+		"""
+		if string_to_find is None:
+			string_to_find = self.string_to_find
+
+		if self.regex:
+			pattern = re.compile(string_to_find, 0 if self.case_sensitive else re.I)
+			return f"any({compiler.constant(pattern)}.search(x) is not None for x in {expression})"
+
+		if self.case_sensitive:
+			return f"({compiler.constant(string_to_find)} in {expression})"
+		else:
+			return f"({compiler.constant(string_to_find)} in map(str.lower, {expression}))"
+
+	def _filter_by_code(self, data, field, match):
+		"""
+		filters using the string dictionary of the dataset (see parsing/string_dictionary.py)
+			`match` is evaluated once per distinct value of `field`,
+			then each item only compares its integer code
+		"""
+		code_attribute = field + "_code"
+
+		dictionary = None
+		for item in data:
+			# all the items of a dataset share the same dictionary
+			if item._dictionary is not dictionary:
+				dictionary = item._dictionary
+				matching_codes = dictionary[field].matching_codes(match)
+
+			yield getattr(item, code_attribute) in matching_codes
+
 
 class DescriptionFilter(BaseContentFilter):
 	def _filter_single_item(self, item):
+		# the lowercase description is cached on the item
+		if not (self.regex or self.case_sensitive):
+			return self.string_to_find in item.description_lower
+
 		return self._find_string_in_string(item.description)
 
+	def _compile(self, compiler):
+		if not (self.regex or self.case_sensitive):
+			return f"({compiler.constant(self.string_to_find)} in i.description_lower)"
+
+		return self._compile_find_string_in_string(compiler, "i.description")
+
 class GroupFilter(BaseContentFilter):
+	def filter(self, data):
+		return self._filter_by_code(data, "group", self._find_string_in_string)
+
+	def matching_codes(self, dictionary):
+		"""
+		returns the codes of the groups (in the given DatasetDictionary) which this filter matches
+		"""
+		return dictionary["group"].matching_codes(self._find_string_in_string)
+
 	def _filter_single_item(self, item):
 		return self._find_string_in_string(item.group)
 
+	def _compile(self, compiler):
+		# there are few distinct groups, thus the result is cached per group
+		return compiler.memoized(self._find_string_in_string, "i.group")
+
 class FriendFilter(BaseContentFilter):
 	def _filter_single_item(self, item):
 		return self._find_string_in_list(item.friends)
 
+	def _compile(self, compiler):
+		return self._compile_find_string_in_list(compiler, "i.friends")
+
 class CurrencyFilter(BaseContentFilter):
+	def filter(self, data):
+		return self._filter_by_code(data, "currency", self._is_currency)
+
+	def _is_currency(self, currency):
+		return currency == self.string_to_find
+
 	def _filter_single_item(self, item):
-		return item.currency == self.string_to_find
+		return self._is_currency(item.currency)
+
+	def _compile(self, compiler):
+		return f"(i.currency == {compiler.constant(self.string_to_find)})"
 
 # Filters whether there is a location set
 class HasLocationFilter(Filter):
 	def _filter_single_item(self, item):
 		return bool(item.location)
 
+	def _compile(self, compiler):
+		return "bool(i.location)"
+
 class LocationFilter(BaseContentFilter):
 	def _filter_single_item(self, item):
 		return (
@@ -70,12 +161,22 @@ class LocationFilter(BaseContentFilter):
 			self._find_string_in_string(item.location)
 		)
 
+	def _compile(self, compiler):
+		# there are few distinct locations, thus the result is cached per location
+		return compiler.and_(
+			"bool(i.location)",
+			compiler.memoized(self._find_string_in_string, "i.location"),
+		)
+
 
 # Filters whether there are extra_details in the DataItem
 class HasExtraDetailsFilter(Filter):
 	def _filter_single_item(self, item):
 		return bool(item.extra_details)
 
+	def _compile(self, compiler):
+		return "bool(i.extra_details)"
+
 # Filters whether there is a specific extra_details key in the DataItem
 class ExtraDetailsFilter(BaseContentFilter):
 	def _filter_single_item(self, item):
@@ -86,6 +187,12 @@ class ExtraDetailsFilter(BaseContentFilter):
 			self._find_string_in_list(item.extra_details)
 		)
 
+	def _compile(self, compiler):
+		return compiler.and_(
+			"bool(i.extra_details)",
+			self._compile_find_string_in_list(compiler, "i.extra_details"),
+		)
+
 # Filters whether there is a specific extra_details value to a certain key in the DataItem
 class ExtraDetailsValueFilter(BaseContentFilter):
 	def __init__(self, string_to_find, extra_details_name, case_sensitive=False, regex=False):
@@ -105,6 +212,18 @@ class ExtraDetailsValueFilter(BaseContentFilter):
 			self._find_string_in_list(item.extra_details[self.extra_details_name])
 		)
 
+	def _compile(self, compiler):
+		return compiler.and_(
+			compiler.and_(
+				"bool(i.extra_details)",
+				self._compile_find_string_in_list(compiler, "i.extra_details", self.extra_details_name),
+			),
+			self._compile_find_string_in_list(
+				compiler,
+				f"i.extra_details[{compiler.constant(self.extra_details_name)}]"
+			),
+		)
+
 
 _OPERATOR_MAP = {
 	"maximum": operator.ge,
@@ -118,7 +237,7 @@ class AmountFilter(Filter):
 			self._action = "maximum"
 			self.amount = self._float(string[1:])
 		elif type(string) is str and string[0] == '>':
-			self._action = "minumum"
+			self._action = "minimum"
 			self.amount = self._float(string[1:])
 		else: # default
 			self._action = "maximum"
@@ -138,7 +257,8 @@ class AmountFilter(Filter):
 			return float(value)
 
 	def _filter_single_item(self, item):
-		return self._operator(self.seconds, float(item))
+		# the amount of the item is compared the same as the given amount (absolute, by default)
+		return self._operator(self.amount, self._float(float(item)))
 
 	def __repr__(self):
 		return f"{self.__class__.__name__}({self._action} {self.amount} amount)"
@@ -24,6 +24,9 @@ class StrFilter(Filter):
 	def filter(self, data):
 		return self._multi.filter(data)
 
+	def _compile(self, compiler):
+		return compiler.compile(self._multi)
+
 	def __repr__(self):
 		return self._multi.__repr__()
 
@@ -101,6 +104,9 @@ class AutoFilter(Filter):
 	def filter(self, data):
 		return self._filter.filter(data)
 
+	def _compile(self, compiler):
+		return compiler.compile(self._filter)
+
 	def __repr__(self):
 		return self._filter.__repr__()
 
@@ -166,6 +172,9 @@ class AutoTimeFilter(BaseTimeFilter):
 	def filter(self, data):
 		return self._filter.filter(data)
 
+	def _compile(self, compiler):
+		return compiler.compile(self._filter)
+
 	def __repr__(self):
 		return self._filter.__repr__()
 
@@ -0,0 +1,253 @@
+import re
+import operator
+import functools
+from collections import deque
+
+from MoneyCsv.utils import ordered_unique
+from MoneyCsv.filters.base_filters import MultiFilter, _compiled_predicate
+from MoneyCsv.filters.content_filters import BaseContentFilter, \
+											 DescriptionFilter, \
+											 GroupFilter      , \
+											 FriendFilter     , \
+											 CurrencyFilter   , \
+											 LocationFilter
+
+# Collapses an OR of literal (non-regex) content filters of the same class into a single filter
+# 	e.g. GroupFilter("Coffee") | GroupFilter("Food") | GroupFilter("Wolt")
+# thus each row is matched once, rather than once per pattern
+# 	substring filters (group, description, location) use a single multi-pattern matcher
+# 	exact filters (friend, currency) use a single set lookup
+#
+# an "or" MultiFilter collapses the whole chain of "or"s below it, on first use (see base_filters.py),
+# 	thus `|`, `join_filters_with_or` and `reduce(operator.or_, ...)` are all collapsed
+
+# the substring matcher depends on the amount of patterns (measured on descriptions):
+# 	a few patterns     - a check per pattern is the fastest (that is the uncollapsed OR)
+# 	more patterns      - a regex alternation of the literals, scanned in C
+# 	a lot of patterns  - the automaton, whose cost does not grow with the patterns (but walks the text in python)
+REGEX_MIN_PATTERNS        = 8
+AHO_CORASICK_MIN_PATTERNS = 64
+
+SUBSTRING_FILTERS = (GroupFilter, DescriptionFilter, LocationFilter)
+EXACT_FILTERS     = (FriendFilter, CurrencyFilter)
+
+
+class AhoCorasick(object):
+	"""
+	finds whether any of the patterns is a substring of a text, in a single pass over the text
+	"""
+	def __init__(self, patterns):
+		# the trie. node 0 is the root
+		self._goto   = [{}]
+		self._fail   = [0]
+		self._output = [False]
+
+		for pattern in patterns:
+			self._add(pattern)
+
+		self._build_fail_links()
+
+	def _add(self, pattern):
+		node = 0
+		for ch in pattern:
+			if ch not in self._goto[node]:
+				self._goto.append({})
+				self._fail.append(0)
+				self._output.append(False)
+				self._goto[node][ch] = len(self._goto) - 1
+			node = self._goto[node][ch]
+		self._output[node] = True
+
+	def _build_fail_links(self):
+		queue = deque(self._goto[0].values())
+
+		while queue:
+			node = queue.popleft()
+			for ch, child in self._goto[node].items():
+				queue.append(child)
+
+				fail = self._fail[node]
+				while fail and ch not in self._goto[fail]:
+					fail = self._fail[fail]
+				self._fail[child] = self._goto[fail].get(ch, 0)
+
+				# a node matches if any of its suffixes is a pattern
+				self._output[child] = self._output[child] or self._output[self._fail[child]]
+
+	def search(self, text):
+		goto, fail, output = self._goto, self._fail, self._output
+
+		# the empty pattern matches everything
+		if output[0]:
+			return True
+
+		node = 0
+		for ch in text:
+			while node and ch not in goto[node]:
+				node = fail[node]
+			node = goto[node].get(ch, 0)
+			if output[node]:
+				return True
+
+		return False
+
+def substring_matcher(patterns):
+	"""
+	returns a function, which returns whether any of the patterns is a substring of its argument
+	"""
+	if len(patterns) >= AHO_CORASICK_MIN_PATTERNS:
+		return AhoCorasick(patterns).search
+
+	if len(patterns) >= REGEX_MIN_PATTERNS:
+		search = re.compile('|'.join(map(re.escape, patterns))).search
+		return lambda text: search(text) is not None
+
+	patterns = tuple(patterns)
+	return lambda text: any(p in text for p in patterns)
+
+
+class MultiPatternFilter(BaseContentFilter):
+	"""
+	an OR of literal content filters of the same class and the same case sensitivity
+		`filters` are the original filters, by order
+	"""
+	def __init__(self, filters):
+		self.filters = list(filters)
+
+		self.filter_class   = type(self.filters[0])
+		self.case_sensitive = self.filters[0].case_sensitive
+		self.regex          = False
+
+		self.patterns = ordered_unique([f.string_to_find for f in self.filters])
+
+		# built on first use
+		# (the case insensitive matchers match lowercase patterns in the lowercase text, as find_string_in_string does)
+		self._matcher = None
+
+	def __repr__(self):
+		return f"{self.__class__.__name__}({self.filter_class.__name__}: {', '.join(self.patterns)})"
+
+	#
+	# Matching
+	#
+	def _get_matcher(self):
+		if self._matcher is None:
+			if self.filter_class in SUBSTRING_FILTERS:
+				matcher = substring_matcher(self.patterns)
+				if self.case_sensitive:
+					self._matcher = matcher
+				else:
+					self._matcher = lambda text: matcher(text.lower())
+			else:
+				self._matcher = frozenset(self.patterns).__contains__
+		return self._matcher
+
+	def _match_string(self, string):
+		return self._get_matcher()(string)
+
+	def _match_list(self, strings):
+		if not self.case_sensitive:
+			strings = map(str.lower, strings)
+		return any(map(self._get_matcher(), strings))
+
+	def _filter_single_item(self, item):
+		if self.filter_class is GroupFilter:
+			return self._match_string(item.group)
+		if self.filter_class is DescriptionFilter:
+			return self._match_string(item.description)
+		if self.filter_class is LocationFilter:
+			return bool(item.location) and self._match_string(item.location)
+		if self.filter_class is FriendFilter:
+			return self._match_list(item.friends)
+		# CurrencyFilter compares the currency as is, regardless of case_sensitive
+		return self._get_matcher()(item.currency)
+
+	def filter(self, data):
+		# groups & currencies are matched once per distinct value (see parsing/string_dictionary.py)
+		if self.filter_class is GroupFilter:
+			return self._filter_by_code(data, "group", self._match_string)
+		if self.filter_class is CurrencyFilter:
+			return self._filter_by_code(data, "currency", self._get_matcher())
+
+		# a single generated expression, rather than dispatching on the filter class per row
+		predicate = _compiled_predicate(self)
+		if predicate is not None:
+			return map(predicate, data)
+
+		return map(self._filter_single_item, data)
+
+	def _compile(self, compiler):
+		if self.filter_class is GroupFilter:
+			return compiler.memoized(self._match_string, "i.group")
+		if self.filter_class is DescriptionFilter:
+			# the lowercase description is cached on the item
+			return self._compile_substring(compiler, "i.description", "i.description_lower")
+		if self.filter_class is LocationFilter:
+			return compiler.and_(
+				"bool(i.location)",
+				compiler.memoized(self._match_string, "i.location"),
+			)
+
+		patterns = compiler.constant(frozenset(self.patterns))
+		if self.filter_class is FriendFilter:
+			if self.case_sensitive:
+				return f"(not {patterns}.isdisjoint(i.friends))"
+			return f"(not {patterns}.isdisjoint(map(str.lower, i.friends)))"
+		return f"(i.currency in {patterns})"
+
+	def _compile_substring(self, compiler, expression, lowercase_expression):
+		if len(self.patterns) < REGEX_MIN_PATTERNS:
+			return functools.reduce(compiler.or_, map(compiler.compile, self.filters))
+
+		if not self.case_sensitive:
+			expression = lowercase_expression
+
+		if len(self.patterns) >= AHO_CORASICK_MIN_PATTERNS:
+			return f"{compiler.constant(AhoCorasick(self.patterns).search)}({expression})"
+
+		search = re.compile('|'.join(map(re.escape, self.patterns))).search
+		return f"({compiler.constant(search)}({expression}) is not None)"
+
+
+def _iter_or_leaves(filter_obj):
+	"""
+	yields the operands of a chain of "or" MultiFilters, by order (e.g. all of the filters of a `join_filters_with_or`)
+	"""
+	# iterative, since `functools.reduce` builds a chain as deep as the amount of filters
+	stack = [filter_obj]
+	while stack:
+		f = stack.pop()
+		if isinstance(f, MultiFilter) and f.operator is operator.or_:
+			stack.append(f.filter_2)
+			stack.append(f.filter_1)
+		else:
+			yield f
+
+def _literal_filters(filter_obj):
+	"""
+	returns the literal content filters which filter_obj is an OR of, or None if it can not be collapsed
+	"""
+	if isinstance(filter_obj, MultiPatternFilter):
+		return filter_obj.filters
+
+	if type(filter_obj) in SUBSTRING_FILTERS + EXACT_FILTERS and not filter_obj.regex:
+		return [filter_obj]
+
+	return None
+
+def collapse_or(filter_obj):
+	"""
+	returns a MultiPatternFilter equivalent to the "or" MultiFilter filter_obj, or None if it can not be collapsed
+	"""
+	filters = []
+	for leaf in _iter_or_leaves(filter_obj):
+		leaf_filters = _literal_filters(leaf)
+		if leaf_filters is None:
+			return None
+		filters.extend(leaf_filters)
+
+	key = (type(filters[0]), filters[0].case_sensitive)
+	if any((type(f), f.case_sensitive) != key for f in filters):
+		return None
+
+	return MultiPatternFilter(filters)
@@ -9,6 +9,10 @@ class BaseTimeFilter(Filter):
 	def _filter_single_item(self, item):
 		return item.is_in_date_range(self.start_time, self.stop_time)
 
+	def _compile(self, compiler):
+		# `is_in_date_range` with any of its include_by flags is a date between start & stop (inclusive)
+		return f"({compiler.constant(self.start_time)} <= i.date <= {compiler.constant(self.stop_time)})"
+
 	def __str__(self):
 		return format_dates(self.start_time, self.stop_time)
 
@@ -128,6 +132,9 @@ class TimeFilter_Month(BaseTimeFilter):
 			item.date.month == self.month
 		)
 
+	def _compile(self, compiler):
+		return f"(i.date.year == {self.year:d} and i.date.month == {self.month:d})"
+
 	def __repr__(self):
 		return f"{self.__class__.__name__}({self.year}/{self.month})"
 
@@ -145,6 +152,8 @@ class TimeFilter_Year(BaseTimeFilter):
 	def _filter_single_item(self, item):
 		return item.date.year == self.year
 
+	def _compile(self, compiler):
+		return f"(i.date.year == {self.year:d})"
 
 	def __repr__(self):
 		return f"{self.__class__.__name__}({self.year})"
@@ -0,0 +1,167 @@
+import os
+import time
+import bisect
+import threading
+import contextlib
+
+# A small in-process metrics registry, exported as a Prometheus text file
+# 	(to be collected by node_exporter's textfile collector, or just read by hand)
+# usage:
+# 	METRICS.counter("reloads_total", "amount of reloads").inc()
+# 	with METRICS.histogram("command_seconds", "command latency", command="week").time():
+# 		...
+# 	METRICS.write(path)
+
+# in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _format_labels(labels, extra=()):
+	items = sorted(labels.items()) + list(extra)
+	if not items:
+		return ''
+	return "{%s}" % ','.join(
+		'%s="%s"' % (k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+		for k, v in items
+	)
+
+def _format_value(value):
+	if value == float("inf"):
+		return "+Inf"
+	return repr(float(value)) if type(value) is float else str(value)
+
+
+#
+# Metrics
+#
+class Counter(object):
+	kind = "counter"
+
+	def __init__(self, labels):
+		self.labels = labels
+		self.value = 0
+		self._lock = threading.Lock()
+
+	def inc(self, amount=1):
+		with self._lock:
+			self.value += amount
+
+	def samples(self, name):
+		yield name, self.labels, (), self.value
+
+class Gauge(Counter):
+	kind = "gauge"
+
+	def set(self, value):
+		with self._lock:
+			self.value = value
+
+class Histogram(object):
+	kind = "histogram"
+
+	def __init__(self, labels, buckets=DEFAULT_BUCKETS):
+		self.labels = labels
+		self.buckets = tuple(sorted(buckets))
+		# counts[i] is the amount of observations in (buckets[i-1], buckets[i]]. the last one is +Inf
+		self.counts = [0] * (len(self.buckets) + 1)
+		self.sum = 0
+		self._lock = threading.Lock()
+
+	def observe(self, value):
+		with self._lock:
+			self.counts[bisect.bisect_left(self.buckets, value)] += 1
+			self.sum += value
+
+	@contextlib.contextmanager
+	def time(self):
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.observe(time.perf_counter() - start)
+
+	@property
+	def count(self):
+		return sum(self.counts)
+
+	def samples(self, name):
+		with self._lock:
+			counts = list(self.counts)
+			total = self.sum
+
+		cumulative = 0
+		for bound, count in zip(self.buckets + (float("inf"),), counts):
+			cumulative += count
+			yield name + "_bucket", self.labels, (("le", _format_value(bound)),), cumulative
+		yield name + "_sum"  , self.labels, (), total
+		yield name + "_count", self.labels, (), cumulative
+
+
+#
+# Registry
+#
+class MetricsRegistry(object):
+	"""
+	holds the metrics by (name, labels)
+		getting a metric creates it on first use, thus callers never have to declare them up front
+	"""
+	def __init__(self, prefix="moneycsv_"):
+		self.prefix = prefix
+
+		# name -> (kind, help)
+		self._families = {}
+		# name -> {sorted labels tuple : metric}
+		self._metrics = {}
+		self._lock = threading.Lock()
+
+	def _get(self, cls, name, help_text, labels, **kwargs):
+		name = self.prefix + name
+		key = tuple(sorted(labels.items()))
+
+		with self._lock:
+			kind, _ = self._families.setdefault(name, (cls.kind, help_text))
+			if kind != cls.kind:
+				raise ValueError(f"metric {name} is a {kind}, not a {cls.kind}")
+
+			family = self._metrics.setdefault(name, {})
+			if key not in family:
+				family[key] = cls(labels, **kwargs)
+			return family[key]
+
+	def counter(self, name, help_text='', **labels):
+		return self._get(Counter, name, help_text, labels)
+
+	def gauge(self, name, help_text='', **labels):
+		return self._get(Gauge, name, help_text, labels)
+
+	def histogram(self, name, help_text='', buckets=DEFAULT_BUCKETS, **labels):
+		return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+	def to_prometheus(self):
+		with self._lock:
+			families = sorted(self._families.items())
+			metrics = {name: list(family.values()) for name, family in self._metrics.items()}
+
+		lines = []
+		for name, (kind, help_text) in families:
+			if help_text:
+				lines.append(f"# HELP {name} {help_text}")
+			lines.append(f"# TYPE {name} {kind}")
+
+			for metric in metrics[name]:
+				for sample_name, labels, extra, value in metric.samples(name):
+					lines.append(f"{sample_name}{_format_labels(labels, extra)} {_format_value(value)}")
+
+		return '\n'.join(lines) + '\n'
+
+	def write(self, path):
+		"""
+		writes the text file atomically, thus a collector never reads a partial file
+		"""
+		tmp_path = path + ".tmp"
+		with open(tmp_path, "w") as handle:
+			handle.write(self.to_prometheus())
+		os.replace(tmp_path, path)
+
+# the process-wide registry
+METRICS = MetricsRegistry()
@@ -1,9 +1,30 @@
 from MoneyCsv.parsing.parse_exception import ParseError
 
-from MoneyCsv.parsing.parsing import DataItem   , \
-									 DataFile   , \
+from MoneyCsv.parsing.parsing import DataItem          , \
+									 FixedPointDataItem, \
+									 DataFile          , \
 									 DataFolder
 
 from MoneyCsv.parsing.description_details import DescriptionDetailsParser_ExtraDetails, \
 												 DescriptionDetailsParser_Friends     , \
 												 DescriptionDetailsParser_Location
+
+from MoneyCsv.parsing.data_view import DataView
+
+from MoneyCsv.parsing.string_dictionary import StringDictionary, \
+											   DatasetDictionary
+
+from MoneyCsv.parsing.currency_conversion import RateTable        , \
+												 CurrencyConverter, \
+												 get_currency_converter
+
+from MoneyCsv.parsing.fixed_point import AmountColumns, \
+										 sum_amounts
+
+from MoneyCsv.parsing.snapshot import DataSnapshot     , \
+									  SnapshotPublisher
+
+from MoneyCsv.parsing.row_decoder import RowDecoder
+
+from MoneyCsv.parsing.change_feed import ChangeSet, \
+										 diff_items
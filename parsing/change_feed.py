@@ -0,0 +1,137 @@
+from collections import defaultdict
+
+# Row level changes between 2 versions of the data (e.g. before & after a reload)
+# 	each row is fingerprinted by (file, hash of its content)
+# 	the content is the parsed values of the row, with its date after reevaluation
+# 		(thus a "----/--/--" row whose previous row moved to another date is changed as well)
+#
+# the diff is O(n), using hash maps only:
+# 	1) rows with the same fingerprint in both versions are unchanged (a multiset match - duplicate rows are counted)
+# 	2) the rest are matched by their place (file, line):
+# 		an old and a new row at the same place are an edit
+# 		a new row without an old one is added, an old row without a new one is removed
+#
+# usage:
+# 	changes = data_folder.reload()
+# 	data_folder.on_change(callback) # callback(changes) is called after every reload
+
+
+def fingerprint(item):
+	"""
+	(file, content hash) of a row
+	"""
+	return (
+		item._file_name,
+		hash((item.date, tuple(item._items.values()))),
+	)
+
+def _place(item):
+	return (item._file_name, item._line)
+
+
+class ChangeSet(object):
+	"""
+	added     : a list of the new rows
+	removed   : a list of the old rows
+	edited    : a list of (old row, new row)
+	unchanged : the amount of rows which are in both versions
+	"""
+	def __init__(self, added=(), removed=(), edited=(), unchanged=0):
+		self.added     = list(added)
+		self.removed   = list(removed)
+		self.edited    = list(edited)
+		self.unchanged = unchanged
+
+	def __repr__(self):
+		return "%s : %d added : %d edited : %d removed" % (
+			self.__class__.__name__,
+			len(self.added),
+			len(self.edited),
+			len(self.removed),
+		)
+
+	def __len__(self):
+		return len(self.added) + len(self.removed) + len(self.edited)
+
+	def __bool__(self):
+		return len(self) > 0
+
+	@property
+	def new_items(self):
+		"""
+		the rows of the new version which were added or edited
+		"""
+		return self.added + [new for old, new in self.edited]
+
+	@property
+	def old_items(self):
+		"""
+		the rows of the old version which were removed or edited
+		"""
+		return self.removed + [old for old, new in self.edited]
+
+	def summary(self):
+		return f"{len(self.added)} added, {len(self.edited)} edited, {len(self.removed)} removed"
+
+	def _text_lines(self):
+		for i in self.added:
+			yield f"    + {i}"
+		for old, new in self.edited:
+			yield f"    ~ {old}"
+			yield f"   -> {new}"
+		for i in self.removed:
+			yield f"    - {i}"
+
+	def to_text(self, max_lines=None):
+		"""
+		max_lines limits the amount of rows shown (the summary line is always shown)
+		"""
+		lines = [self.summary()]
+
+		for n, line in enumerate(self._text_lines()):
+			if max_lines is not None and n >= max_lines:
+				lines.append(f"    ... ({len(self)} changes)")
+				break
+			lines.append(line)
+
+		return '\n'.join(lines)
+
+
+def diff_items(old_items, new_items):
+	"""
+	returns the ChangeSet from old_items to new_items
+	"""
+	# 1) match the unchanged rows
+	old_by_fingerprint = defaultdict(list)
+	for i in old_items:
+		old_by_fingerprint[fingerprint(i)].append(i)
+
+	unmatched_new = []
+	unchanged = 0
+	for i in new_items:
+		same = old_by_fingerprint.get(fingerprint(i))
+		if same:
+			same.pop()
+			unchanged += 1
+		else:
+			unmatched_new.append(i)
+
+	# 2) match the rest by their place
+	# 	(kept in the order of old_items, thus `removed` is ordered as the old data)
+	leftover = {id(i) for same in old_by_fingerprint.values() for i in same}
+	unmatched_old = {
+		_place(i): i
+		for i in old_items
+		if id(i) in leftover
+	}
+
+	added = []
+	edited = []
+	for i in unmatched_new:
+		old = unmatched_old.pop(_place(i), None)
+		if old is None:
+			added.append(i)
+		else:
+			edited.append((old, i))
+
+	return ChangeSet(added, unmatched_old.values(), edited, unchanged)
@@ -12,6 +12,7 @@ ALLOWED_HEADERS = BASE_HEADERS + [
 	"Payment", # How was this transaction payed - credic card, cash, etc.
 	"Currency", # With which currency was this transaction payed
 	"Amount_Converted", # Amount after converting from the currency
+	"Amountnis", # Amount in nis, when written explicitly
 
 	"Frequency", # the frequency of automatic trasactions
 ]
@@ -0,0 +1,201 @@
+import os
+import csv
+import datetime
+
+import numpy as np
+
+from MoneyCsv.consts import DEFAULT_RATES_DIRECTORY, POSSIBLE_FILE_EXTENSIONS
+from MoneyCsv.utils import get_files_manifest
+
+# Exchange rate tables
+# 	<rates directory>/<currency>.csv (e.g. euro.csv), using the same currency names as the data files
+# 	every table has the headers "Date,Rate", where Rate is the amount of nis per a single unit
+# 	the dates use the same format as the data files (yyyy/mm/dd), and may be in any order
+#
+# the rate of a transaction is the last rate published at or before its date
+# 	(transactions before the first rate use the first rate)
+
+BASE_CURRENCY = "nis"
+RATES_HEADERS = ["Date", "Rate"]
+
+
+def _ordinal(item):
+	# a placeholder date which could not be evaluated (e.g. in the first line of a file) uses the first rate
+	if type(item.date) is str:
+		return 0
+	return item.date.toordinal()
+
+def iter_rate_file_paths(rates_directory):
+	"""
+	yields (currency, path) of each rates file
+	"""
+	if not os.path.isdir(rates_directory):
+		return
+
+	for file_name in sorted(os.listdir(rates_directory)):
+		currency, extension = os.path.splitext(file_name)
+		if extension in POSSIBLE_FILE_EXTENSIONS and not file_name.startswith(('.', '_')):
+			yield currency.lower(), os.path.join(rates_directory, file_name)
+
+def get_rates_manifest(rates_directory=DEFAULT_RATES_DIRECTORY):
+	"""
+	the manifest of the rates files (the same as `CurrencyConverter.manifest()`), without loading them
+	"""
+	rates_directory = os.path.expanduser(rates_directory)
+	return get_files_manifest(path for _, path in iter_rate_file_paths(rates_directory))
+
+
+class RateTable(object):
+	"""
+	the rates of a single currency, as 2 arrays sorted by date
+		dates: int64 array of date ordinals
+		rates: float64 array (nis per unit)
+	"""
+	def __init__(self, currency, dates, rates):
+		order = np.argsort(dates, kind="stable")
+
+		self.currency = currency
+		self.dates = np.asarray(dates, dtype=np.int64)[order]
+		self.rates = np.asarray(rates, dtype=np.float64)[order]
+
+	def __repr__(self):
+		return "%s : %s : %d rates" % (
+			self.__class__.__name__,
+			self.currency,
+			len(self.rates),
+		)
+
+	def __len__(self):
+		return len(self.rates)
+
+	@classmethod
+	def from_csv(cls, currency, path):
+		dates = []
+		rates = []
+
+		with open(path) as handle:
+			r = csv.reader(handle)
+
+			headers = next(r, None)
+			if headers != RATES_HEADERS:
+				raise ValueError(f"invalid rates file headers: {headers} (expected {RATES_HEADERS}) in {path}")
+
+			for line, row in enumerate(r, 1):
+				# skip empty lines & comments
+				if not row or row[0].startswith('#'):
+					continue
+				try:
+					dates.append(datetime.datetime.strptime(row[0], "%Y/%m/%d").toordinal())
+					rates.append(float(row[1]))
+				except (ValueError, IndexError) as exc:
+					raise ValueError(f"invalid rate in {path} : {line} : {row}") from exc
+
+		return cls(currency, dates, rates)
+
+	def rates_at(self, dates):
+		"""
+		an as-of lookup of a whole column at once
+		dates: int64 array of date ordinals
+		"""
+		if not len(self.rates):
+			return np.full(len(dates), np.nan)
+
+		index = np.searchsorted(self.dates, dates, side="right") - 1
+		return self.rates[np.maximum(index, 0)]
+
+
+class CurrencyConverter(object):
+	"""
+	converts the amounts of DataItems to nis
+		the precedence of every item is:
+			1) Amountnis, if the file has it
+			2) Amount_Converted, if it was filled
+			3) Amount * the rate of its currency at its date
+			4) Amount (nis, or a currency without a rate table)
+
+	usage:
+		CurrencyConverter(path).convert(data_file.data)
+		# each item now has `amount_nis`
+	"""
+	def __init__(self, rates_directory=DEFAULT_RATES_DIRECTORY):
+		self._path = os.path.expanduser(rates_directory)
+		self._manifest = None
+		self.tables = {}
+
+		self.reload()
+
+	def __repr__(self):
+		return "%s : %s : %s" % (
+			self.__class__.__name__,
+			self._path,
+			', '.join(map(str, self.tables.values())) or "no rates",
+		)
+
+	def _iter_rate_file_paths(self):
+		return iter_rate_file_paths(self._path)
+
+	def reload(self):
+		self.tables = {
+			currency: RateTable.from_csv(currency, path)
+			for currency, path in self._iter_rate_file_paths()
+		}
+		self._manifest = self.manifest()
+
+	def manifest(self):
+		return get_files_manifest(path for _, path in self._iter_rate_file_paths())
+
+	def _reload_if_modified(self):
+		if self.manifest() != self._manifest:
+			self.reload()
+
+	def convert(self, data):
+		"""
+		sets `amount_nis` of every item, and returns them as a float64 array
+		data is a list of the DataItems of a single dataset (e.g. `DataFile.data`), thus they share a string dictionary
+		"""
+		if not data:
+			return np.zeros(0)
+
+		self._reload_if_modified()
+
+		n = len(data)
+		amounts = np.fromiter((i.amount        for i in data), np.float64, n)
+		dates   = np.fromiter(map(_ordinal, data)             , np.int64  , n)
+		codes   = np.fromiter((i.currency_code for i in data), np.int64  , n)
+
+		converted = amounts.copy()
+
+		# 3) a single as-of lookup per currency
+		currencies = data[0]._dictionary["currency"]
+		for code in np.unique(codes).tolist():
+			currency = currencies.decode(code)
+			if currency == BASE_CURRENCY or currency not in self.tables:
+				continue
+
+			mask = codes == code
+			rates = self.tables[currency].rates_at(dates[mask])
+			converted[mask] = amounts[mask] * rates
+
+		# 2 & 1) explicit values, which were written in the file
+		for index, i in enumerate(data):
+			explicit = getattr(i, "amount_nis", None)
+			if explicit is None:
+				explicit = getattr(i, "amount_converted", None)
+			if explicit is not None:
+				converted[index] = explicit
+
+		for i, amount_nis in zip(data, converted.tolist()):
+			i.amount_nis = amount_nis
+
+		return converted
+
+
+_CURRENCY_CONVERTER = None
+def get_currency_converter():
+	"""
+	the process-wide converter (the rate tables are loaded on first use)
+	"""
+	global _CURRENCY_CONVERTER
+	if _CURRENCY_CONVERTER is None:
+		_CURRENCY_CONVERTER = CurrencyConverter()
+	return _CURRENCY_CONVERTER
@@ -0,0 +1,99 @@
+import numpy as np
+
+
+class DataView(object):
+	"""
+	A read-only, list-like view of some of the items of a dataset
+		parent  : the list/tuple of the whole dataset (e.g. `DataFolder.data`). never copied
+		indices : a sorted int64 array of the positions of the viewed items in the parent
+
+	a view of a view refers to the same parent, thus chaining filters never copies the items,
+		it only narrows the indices
+	"""
+	def __init__(self, parent, indices):
+		self._parent = parent
+		self._indices = indices
+
+	@classmethod
+	def from_mask(cls, data, mask):
+		"""
+		data is either a list/tuple of items, or a DataView
+		mask is an iterable of bools, of the same length as data
+		"""
+		mask = np.fromiter(mask, dtype=bool, count=len(data))
+
+		if isinstance(data, DataView):
+			return cls(data._parent, data._indices[mask])
+
+		return cls(data, np.flatnonzero(mask))
+
+	@classmethod
+	def of(cls, data):
+		"""
+		a view of all of the items of data
+		"""
+		if isinstance(data, DataView):
+			return data
+
+		return cls(data, np.arange(len(data)))
+
+	def __repr__(self):
+		return "%s : %d of %d items" % (
+			self.__class__.__name__,
+			len(self._indices),
+			len(self._parent),
+		)
+
+	@property
+	def parent(self):
+		return self._parent
+
+	@property
+	def indices(self):
+		return self._indices
+
+	#
+	# list-like interface
+	#
+	def __len__(self):
+		return len(self._indices)
+
+	def __bool__(self):
+		return len(self._indices) > 0
+
+	def __iter__(self):
+		return map(self._parent.__getitem__, self._indices.tolist())
+
+	def __reversed__(self):
+		return map(self._parent.__getitem__, reversed(self._indices.tolist()))
+
+	def __getitem__(self, n):
+		if isinstance(n, slice):
+			return DataView(self._parent, self._indices[n])
+
+		return self._parent[int(self._indices[n])]
+
+	def __contains__(self, item):
+		return any(i is item for i in self)
+
+	def __eq__(self, other):
+		if isinstance(other, DataView):
+			return self._parent is other._parent and np.array_equal(self._indices, other._indices)
+		if isinstance(other, (list, tuple)):
+			return len(self) == len(other) and all(a is b for a, b in zip(self, other))
+		return NotImplemented
+
+	def __add__(self, other):
+		return self.tolist() + list(other)
+
+	def __radd__(self, other):
+		return list(other) + self.tolist()
+
+	def index(self, item):
+		for n, i in enumerate(self):
+			if i is item:
+				return n
+		raise ValueError(f"{item} is not in the view")
+
+	def tolist(self):
+		return list(self)
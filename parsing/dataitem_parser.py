@@ -1,6 +1,11 @@
 import datetime
 
 from MoneyCsv.parsing.consts import *
+from MoneyCsv.parsing.string_dictionary import DatasetDictionary
+from MoneyCsv.parsing.row_decoder       import RowDecoder
+
+# the dictionary of items which are parsed on their own (without a DataFile)
+STANDALONE_DICTIONARY = DatasetDictionary()
 
 
 class DataItemParser(object):
@@ -21,7 +26,7 @@ class DataItemParser(object):
 		this way, place holders such as "My date is the same as the previous object date"
 			(which is written as "----/--/--") will be evaluated
 	"""
-	def __init__(self, items, headers, file_name="Unknown", line="??"):
+	def __init__(self, items, headers, file_name="Unknown", line="??", dictionary=None, decoder=None):
 		# debug information
 		self._file_name = file_name
 		self._line = line
@@ -29,13 +34,15 @@ class DataItemParser(object):
 		if self._check_if_comment(items):
 			return
 
-		self._headers = headers
-		self._items = {
-			key: self.PARSERS[key](value)
-			for key, value in zip(headers, items)
-		}
+		# the string dictionary of the dataset. repetitive strings are interned through it
+		self._dictionary = dictionary if dictionary is not None else STANDALONE_DICTIONARY
 
-		self.set_defaults()
+		# the decoder is compiled once per file (see DataFile._load_data & row_decoder.py)
+		if decoder is None:
+			decoder = RowDecoder.of(tuple(headers), DataItemParser)
+
+		self._headers = headers
+		self._items = decoder.decode(self, items)
 
 	def __repr__(self):
 		if self.is_comment:
@@ -87,55 +94,58 @@ class DataItemParser(object):
 		self.amount = float(s)
 		return self.amount
 	def _parser_currency(self, s):
-		self.currency = s
-		return s
+		self.currency, self.currency_code = self._dictionary.encode("currency", s)
+		return self.currency
 	def _parser_group(self, s):
-		self.group = s
-		return s
+		self.group, self.group_code = self._dictionary.encode("group", s)
+		return self.group
 	def _parser_description(self, s):
-		self.description = s
-		return s
+		self.description, self.description_code = self._dictionary.encode("description", s)
+		return self.description
 
 	def _parser_amount_nis(self, s):
-		self.amount_nis = float(s)
+		# empty when the amount in nis was not written (it is converted later)
+		self.amount_nis = float(s) if s else None
 		return self.amount_nis
 	def _parser_prediscount_amount(self, s):
 		self.prediscount_amount = float(s)
 		return self.prediscount_amount
 	def _parser_amount_converted(self, s):
-		self.amount_converted = s
-		return s
+		# empty when the transaction was not converted
+		self.amount_converted = float(s) if s else None
+		return self.amount_converted
 	def _parser_payment(self, s):
-		self.payment = s
-		return s
+		self.payment, self.payment_code = self._dictionary.encode("payment", s)
+		return self.payment
 	def _parser_frequency(self, s):
-		self.frequency = s
-		return s
-
-	@property
-	def PARSERS(self):
-		"""
-		returns a list of parsers by order
-		"""
-		return {
-			"Date": self._parser_date,
-			"Amount": self._parser_amount,
-			"Currency": self._parser_currency,
-			"Group": self._parser_group,
-			"Description": self._parser_description,
-			"PreDiscount_Amount": self._parser_prediscount_amount,
-			"Amountnis": self._parser_amount_nis,
-			"Payment": self._parser_payment,
-			"Amount_Converted": self._parser_amount_converted,
-			"Frequency": self._parser_frequency,
-		}
-
-	def set_defaults(self):
-		if not hasattr(self, "currency"):
-			self.currency = "nis"
-
-		if not hasattr(self, "prediscount_amount"):
-			self.prediscount_amount = self.amount
+		self.frequency, self.frequency_code = self._dictionary.encode("frequency", s)
+		return self.frequency
+
+	# the parser of each header (unbound - called by RowDecoder as parser(item, value))
+	PARSERS = {
+		"Date": _parser_date,
+		"Amount": _parser_amount,
+		"Currency": _parser_currency,
+		"Group": _parser_group,
+		"Description": _parser_description,
+		"PreDiscount_Amount": _parser_prediscount_amount,
+		"Amountnis": _parser_amount_nis,
+		"Payment": _parser_payment,
+		"Amount_Converted": _parser_amount_converted,
+		"Frequency": _parser_frequency,
+	}
+
+	def _default_currency(self):
+		self.currency, self.currency_code = self._dictionary.encode("currency", "nis")
+	def _default_prediscount_amount(self):
+		self.prediscount_amount = self.amount
+
+	# the default of each optional header, used when the file (or the row) has no value for it
+	# (called by RowDecoder after the parsers, by this order)
+	DEFAULTS = {
+		"Currency": _default_currency,
+		"PreDiscount_Amount": _default_prediscount_amount,
+	}
 
 	@property
 	def currency_symbol(self):
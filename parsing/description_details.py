@@ -1,4 +1,5 @@
 import re
+import functools
 
 from MoneyCsv.utils import ordered_unique
 from MoneyCsv.parsing.consts import *
@@ -122,3 +123,23 @@ DETAIL_PARSERS = {
 	"friends"      : DescriptionDetailsParser_Friends,
 	"location"     : DescriptionDetailsParser_Location,
 }
+
+
+# Normalized descriptions
+# 	many items share a description, thus each form is computed once per distinct description,
+# 	and the items of the same description share the same string object
+DESCRIPTION_CACHE_SIZE = 2**16
+
+@functools.lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+def strip_description(description):
+	"""
+	returns the description without any of the details (extra details, friends, location)
+	"""
+	for v in DETAIL_PARSERS.values():
+		description = v.strip(description)
+
+	return description
+
+@functools.lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+def lower_description(description):
+	return description.lower()
@@ -0,0 +1,168 @@
+from array import array
+from decimal import Decimal
+
+import numpy as np
+
+from MoneyCsv.consts import MINOR_UNITS_PER_UNIT
+from MoneyCsv.parsing.data_view import DataView
+
+# Fixed point amounts (optional - see FIXED_POINT_AMOUNTS in consts.py)
+# 	the amounts of a dataset are stored as int64 minor units (agorot / cents), in compact columns,
+# 	thus sums are exact integer sums (no rounding error accumulates over the years),
+# 	and are computed by numpy rather than by calling DataItem.__add__ per item
+#
+# 	a DataFolder shares a single AmountColumns between all of its files (as the DatasetDictionary)
+# 	each item keeps its row in the columns (`amount_row`), which is allocated before the item is parsed,
+# 	and its amount fields are properties over that row (see FixedPointDataItem in parsing.py),
+# 	thus the amounts are not kept as floats on the items
+#
+# the amounts are converted back to float (or Decimal) only when presented (see the statistics)
+#
+# usage:
+# 	total = sum_amounts(items)
+
+
+def to_minor_units(value):
+	"""
+	rounds an amount (float) to the nearest minor unit
+	amounts written with up to 2 digits after the dot are converted exactly
+	"""
+	return round(value * MINOR_UNITS_PER_UNIT)
+
+def from_minor_units(minor_units):
+	return minor_units / MINOR_UNITS_PER_UNIT
+
+def to_decimal(minor_units):
+	return Decimal(minor_units) / MINOR_UNITS_PER_UNIT
+
+
+# the value of a field which was not set yet (e.g. `amount_nis`, before the currencies are converted)
+UNSET = -2 ** 63
+
+# the amount of datasets (e.g. `DataFolder.data`) whose rows are cached, see AmountColumns.rows
+ROWS_CACHE_SIZE = 8
+
+
+class AmountColumns(object):
+	# `amount_nis` is the amount used by the statistics (see DataItem.__float__)
+	FIELDS = ("amount", "prediscount_amount", "amount_nis")
+
+	def __init__(self):
+		self._columns = {
+			field: array('q')
+			for field in self.FIELDS
+		}
+
+		# {id(parent): (parent, rows)} of the parents of DataViews
+		self._rows_cache = {}
+
+	def __repr__(self):
+		return "%s : %d rows" % (
+			self.__class__.__name__,
+			len(self),
+		)
+
+	def __len__(self):
+		return len(self._columns["amount"])
+
+	def new_row(self):
+		"""
+		returns the row of a new item, whose fields are not set yet
+		"""
+		row = len(self)
+		for column in self._columns.values():
+			column.append(UNSET)
+		return row
+
+	def column(self, field):
+		"""
+		returns a numpy view of the column (not a copy)
+		"""
+		return np.frombuffer(self._columns[field], dtype=np.int64)
+
+	def get(self, row, field="amount_nis"):
+		"""
+		returns the value in minor units (UNSET if it was not set)
+		"""
+		return self._columns[field][row]
+
+	def set(self, row, field, value):
+		"""
+		value is an amount (float), or None for unsetting it
+		"""
+		self._columns[field][row] = UNSET if value is None else to_minor_units(value)
+
+	def rows(self, items):
+		"""
+		returns the rows of items (an int64 array), or None if any of the items is not stored in these columns
+		the rows of the parent of a DataView are cached, thus the rows of a view are a single numpy lookup
+		"""
+		if isinstance(items, DataView):
+			rows = self._rows_of_parent(items.parent)
+			return None if rows is None else rows[items.indices]
+
+		return self._rows_of_list(items)
+
+	def _rows_of_list(self, items):
+		if any(getattr(i, "_amount_columns", None) is not self for i in items):
+			return None
+
+		return np.fromiter((i.amount_row for i in items), dtype=np.int64, count=len(items))
+
+	def _rows_of_parent(self, parent):
+		cached = self._rows_cache.get(id(parent))
+		if cached is not None and cached[0] is parent and len(cached[1]) == len(parent):
+			return cached[1]
+
+		rows = self._rows_of_list(parent)
+		if rows is not None:
+			if len(self._rows_cache) >= ROWS_CACHE_SIZE:
+				self._rows_cache.clear()
+			self._rows_cache[id(parent)] = (parent, rows)
+
+		return rows
+
+	def sum(self, rows, field="amount_nis"):
+		"""
+		returns the exact sum of the amounts of rows (see `rows`), in minor units
+		"""
+		return int(self.column(field)[rows].sum())
+
+
+def amount_of(item):
+	"""
+	the amount in nis of a single item
+	in minor units (int) in the fixed point mode, otherwise in nis (float)
+	used with `present_amount` when summing items one by one
+	"""
+	columns = getattr(item, "_amount_columns", None)
+	if columns is None:
+		return float(item)
+
+	return columns.get(item.amount_row)
+
+def present_amount(total, items_are_fixed_point):
+	"""
+	converts a sum of `amount_of` values to nis (float)
+	"""
+	if items_are_fixed_point:
+		return from_minor_units(total)
+	return total
+
+def is_fixed_point(items):
+	return bool(items) and hasattr(items[0], "_amount_columns")
+
+def sum_amounts(items):
+	"""
+	the total amount in nis of items (as float, for presentation)
+	exact in the fixed point mode
+	"""
+	if not items:
+		return 0
+
+	columns = getattr(items[0], "_amount_columns", None)
+	rows = None if columns is None else columns.rows(items)
+	if rows is None:
+		return sum(items)
+
+	return from_minor_units(columns.sum(rows))
@@ -1,19 +1,25 @@
 import os
 import re
 import csv
+import functools
 from itertools import chain
 
 from MoneyCsv.utils import *
 from MoneyCsv.parsing.consts import *
 from MoneyCsv.parsing.dataitem_parser     import DataItemParser
-from MoneyCsv.parsing.description_details import DETAIL_PARSERS
+from MoneyCsv.parsing.row_decoder         import RowDecoder
+from MoneyCsv.parsing.description_details import DETAIL_PARSERS, strip_description, lower_description
+from MoneyCsv.parsing.string_dictionary   import DatasetDictionary
+from MoneyCsv.parsing.currency_conversion import get_currency_converter
+from MoneyCsv.parsing.fixed_point         import AmountColumns, UNSET, from_minor_units
+from MoneyCsv.parsing.change_feed         import diff_items
 
 
 class DataItem(DataItemParser):
 	"""
 	exported functions:
 		__float__:
-			return the amount (currently not converting between currencies)
+			return the amount in nis (converted by parsing/currency_conversion.py)
 		__add__:
 			casting to float, and adding the amounts
 		__getitem__:
@@ -32,8 +38,8 @@ class DataItem(DataItemParser):
 		is_in_date_range:
 			checks whether this object is contained within a date range
 	"""
-	def __init__(self, items, headers, file_name="Unknown", line="??"):
-		super().__init__(items, headers, file_name, line)
+	def __init__(self, items, headers, file_name="Unknown", line="??", dictionary=None, decoder=None):
+		super().__init__(items, headers, file_name, line, dictionary, decoder)
 		
 		if not self.is_comment:
 			self._process_description_details()
@@ -42,14 +48,14 @@ class DataItem(DataItemParser):
 		for k, v in DETAIL_PARSERS.items():
 			setattr(self, k, v.extract_values(self))
 
-	@property
+	# computed on first access, and kept on the item
+	@functools.cached_property
 	def description_stripped(self):
-		description = self.description
-
-		for k, v in DETAIL_PARSERS.items():
-			description = v.strip(description)
+		return strip_description(self.description)
 
-		return description
+	@functools.cached_property
+	def description_lower(self):
+		return lower_description(self.description)
 
 
 
@@ -64,21 +70,22 @@ class DataItem(DataItemParser):
 
 	# return total amount in nis
 	def __float__(self):
-		return self.amount
+		# amount_nis is set by the DataFile, once the whole file is parsed
+		return getattr(self, "amount_nis", self.amount)
 
 	def __abs__(self):
 		return abs(float(self))
 
 	# when __add__ is called (usually by calling `sum` on a list of DataItems), cast to int
 	def __add__(self, other):
-		if type(other) is DataItem:
+		if isinstance(other, DataItem):
 			return float(self) + float(other)
 		elif type(other) in (float, int):
 			return float(self) + other
 		else:
 			return NotImplemented
 	def __radd__(self, other):
-		if type(other) is DataItem:
+		if isinstance(other, DataItem):
 			return float(self) + float(other)
 		elif type(other) in (float, int):
 			return float(self) + other
@@ -113,9 +120,70 @@ class DataItem(DataItemParser):
 		return False
 
 
+def iter_data_file_paths(folder, recursive=True):
+	for folder_path, folders, files in os.walk(folder):
+		for file_name in files:
+			if not any(chain(
+				(re.search(exclude_pattern, file_name)   for exclude_pattern in FILE_EXCLUDE_PATTERNS),
+				(re.search(exclude_pattern, folder_path) for exclude_pattern in FOLDER_EXCLUDE_PATTERNS),
+			)):
+				yield os.path.join(folder_path, file_name)
+
+		if not recursive:
+			break
+
+def get_data_manifest(path):
+	"""
+	the manifest of a data file/folder (the same as its `manifest()`), without loading it
+	"""
+	if os.path.isdir(path):
+		return get_files_manifest(iter_data_file_paths(path))
+	return get_files_manifest([path])
+
+def _amount_property(field):
+	"""
+	an amount field of a FixedPointDataItem, stored in its row of the AmountColumns
+	an unset field raises AttributeError, as a missing attribute does (e.g. for `getattr(item, "amount_nis", None)`)
+	"""
+	def getter(self):
+		value = self._amount_columns.get(self.amount_row, field)
+		if value == UNSET:
+			raise AttributeError(field)
+		return from_minor_units(value)
+
+	def setter(self, value):
+		self._amount_columns.set(self.amount_row, field, value)
+
+	return property(getter, setter)
+
+class FixedPointDataItem(DataItem):
+	"""
+	a DataItem whose amounts are stored in AmountColumns (see parsing/fixed_point.py), rather than as floats on it
+	"""
+	amount             = _amount_property("amount")
+	prediscount_amount = _amount_property("prediscount_amount")
+	amount_nis         = _amount_property("amount_nis")
+
+	def __init__(self, items, headers, file_name="Unknown", line="??", dictionary=None, decoder=None, amounts=None):
+		# the row is allocated before parsing, thus the parsers store the amounts into it
+		self._amount_columns = amounts
+		self.amount_row = amounts.new_row()
+
+		super().__init__(items, headers, file_name, line, dictionary, decoder)
+
+
+def _new_amount_columns():
+	return AmountColumns() if FIXED_POINT_AMOUNTS else None
+
 class DataFile(object):
-	def __init__(self, path):
+	def __init__(self, path, dictionary=None, amounts=None):
 		self._path = path
+		# a DataFolder shares a single dictionary between all of its files, thus the codes are comparable
+		self._owns_dictionary = dictionary is None
+		self.dictionary = dictionary if dictionary is not None else DatasetDictionary()
+		# and a single AmountColumns (in the fixed point mode), thus the amounts of all of the files are summed at once
+		self._owns_amounts = amounts is None
+		self.amounts = amounts if amounts is not None else _new_amount_columns()
 		self.reload()
 
 	def __repr__(self):
@@ -126,8 +194,18 @@ class DataFile(object):
 		)
 
 	def reload(self):
+		# a new dictionary (rather than clearing it), since the items of the previous load keep using the old one
+		# 	thus strings which were removed from the file are not kept forever
+		if self._owns_dictionary:
+			self.dictionary = DatasetDictionary()
+
+		# as well as new amount columns
+		if self._owns_amounts:
+			self.amounts = _new_amount_columns()
+
 		self._load_data(self._path)
 		self._reevaluate_data()
+		self._convert_currencies()
 		self._create_titles()
 		self._create_friends_list()
 		self._create_locations_list()
@@ -146,6 +224,16 @@ class DataFile(object):
 			self.headers = next(r)
 		except StopIteration:
 			self.empty = True
+			self.headers = []
+
+		# compiled once per file - validates the headers, and fixes the parser of each column
+		self.decoder = RowDecoder(self.headers, DataItem, self._path) if self.headers else None
+
+		# in the fixed point mode, the amounts are stored in self.amounts
+		if self.amounts is None:
+			new_item = DataItem
+		else:
+			new_item = functools.partial(FixedPointDataItem, amounts=self.amounts)
 
 		self.data = list(filter(
 			# filter out comment lines
@@ -153,11 +241,13 @@ class DataFile(object):
 			map(
 				# parse each line
 				# obj is the output of enumerate - obj[0] is index, obj[1] is value
-				lambda obj: DataItem(
+				lambda obj: new_item(
 					obj[1],
 					self.headers,
 					file_name=self._path,
 					line=obj[0],
+					dictionary=self.dictionary,
+					decoder=self.decoder,
 				),
 				enumerate(r)
 			)
@@ -176,6 +266,10 @@ class DataFile(object):
 		# calling the last item, with its previous item
 		self.data[-1].reevaluate(self.data[-2], None)
 
+	def _convert_currencies(self):
+		# requires the dates, thus it runs after _reevaluate_data
+		get_currency_converter().convert(self.data)
+
 	def _create_titles(self):
 		# iterate every item in the data, collect its group into a unique list
 		self.titles = list(set(i.group for i in self.data))
@@ -203,6 +297,12 @@ class DataFile(object):
 		invalid_items = [i for i in self.data if not i.is_fully_parsed()]
 		return invalid_items or True
 
+	def manifest(self):
+		"""
+		changes whenever the file is modified
+		"""
+		return get_files_manifest([self._path])
+
 	def __getitem__(self, n):
 		return self.data[n]
 
@@ -219,6 +319,13 @@ class DataFolder(object):
 		self._path = folder
 		self._recursive = recursive
 
+		self.dictionary = DatasetDictionary()
+		self.amounts = _new_amount_columns()
+
+		# callables which get the ChangeSet of every reload (see parsing/change_feed.py)
+		self._change_listeners = []
+		self.changes = None
+
 		self._load_data_files()
 		self._load_data()
 
@@ -230,23 +337,14 @@ class DataFolder(object):
 			len(self.data)
 		)
 
+	def _iter_data_file_paths(self):
+		return iter_data_file_paths(self._path, self._recursive)
+
 	def _get_all_data_files(self):
-		self.data_files = []
-
-		for folder_path, folders, files in os.walk(self._path):
-			for file_name in files:
-				if not any(chain(
-					(re.search(exclude_pattern, file_name)   for exclude_pattern in FILE_EXCLUDE_PATTERNS),
-					(re.search(exclude_pattern, folder_path) for exclude_pattern in FOLDER_EXCLUDE_PATTERNS),
-				)):
-					self.data_files.append(
-						DataFile(
-							os.path.join(folder_path, file_name)
-						)
-					)
-
-			if not self._recursive:
-				break
+		self.data_files = [
+			DataFile(path, self.dictionary, self.amounts)
+			for path in self._iter_data_file_paths()
+		]
 
 		# sort the data files by date
 		self.data_files = sorted(
@@ -254,6 +352,12 @@ class DataFolder(object):
 			key=lambda df: df._data_range[1]
 		)
 
+	def manifest(self):
+		"""
+		changes whenever a data file is added, removed or modified
+		"""
+		return get_files_manifest(self._iter_data_file_paths())
+
 
 	def _load_data_files(self):
 		self._get_all_data_files()
@@ -263,6 +367,7 @@ class DataFolder(object):
 
 	def _load_data(self):
 		self.data      =          sum([i.data      for i in self.data_files], [])
+		self.titles    = sorted(set(sum([i.titles    for i in self.data_files], [])))
 		self.friends   = list(set(sum([i.friends   for i in self.data_files], [])))
 		self.locations = list(set(sum([i.locations for i in self.data_files], [])))
 
@@ -270,12 +375,36 @@ class DataFolder(object):
 	def __getitem__(self, n):
 		return self.data[n]
 
+	def on_change(self, callback):
+		"""
+		callback(changes) is called after every reload (e.g. for updating caches & indexes)
+		"""
+		self._change_listeners.append(callback)
+
 	def reload(self):
+		"""
+		returns the ChangeSet of the rows, versus the data before the reload
+		"""
+		old_data = self.data
+
+		# every file encodes its strings into a new shared dictionary,
+		# 	and stores its amounts into new shared columns (see DataFile.reload)
+		self.dictionary = DatasetDictionary()
+		self.amounts = _new_amount_columns()
+
 		for i in self.data_files:
+			i.dictionary = self.dictionary
+			i.amounts = self.amounts
 			i.reload()
 
 		self._load_data()
 
+		self.changes = diff_items(old_data, self.data)
+		for callback in self._change_listeners:
+			callback(self.changes)
+
+		return self.changes
+
 	def _validate_data(self):
 		invalid_items = []
 		res = True
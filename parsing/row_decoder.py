@@ -0,0 +1,88 @@
+import functools
+
+from MoneyCsv.parsing.consts import BASE_HEADERS, ALLOWED_HEADERS
+from MoneyCsv.parsing.parse_exception import ParseError
+
+# A row decoder is compiled once per file, from its header line:
+# 	columns  : a tuple of (header, parser) by the order of the columns
+# 	defaults : the default setters of the headers which the file does not have
+# thus decoding a row is a single zip over the columns, without any lookup per value
+#
+# the headers are validated against ALLOWED_HEADERS when compiling,
+# 	thus an unknown header fails the file up front, rather than in the middle of it
+#
+# parser_class is the DataItemParser class, which provides:
+# 	PARSERS  : {header: parser function}
+# 	DEFAULTS : {header: default setter function}
+
+
+class RowDecoder(object):
+	def __init__(self, headers, parser_class, file_name="Unknown"):
+		self.headers = tuple(headers)
+
+		self._validate(file_name)
+
+		self.columns = tuple(
+			(header, parser_class.PARSERS[header])
+			for header in self.headers
+		)
+		# the headers of the file, and the headers of each short row, do not change per row
+		self._defaults_of_length = {}
+		self._parser_class = parser_class
+		self.defaults = self._get_defaults(len(self.headers))
+
+	def __repr__(self):
+		return "%s : %s" % (
+			self.__class__.__name__,
+			','.join(self.headers),
+		)
+
+	@classmethod
+	@functools.lru_cache(maxsize=None)
+	def of(cls, headers, parser_class):
+		"""
+		a decoder per distinct header line (used when a DataItem is created without a decoder)
+		"""
+		return cls(headers, parser_class)
+
+	def _validate(self, file_name):
+		unknown = [h for h in self.headers if h not in ALLOWED_HEADERS]
+		if unknown:
+			raise ParseError(f"[!] unknown headers {unknown} in file \"{file_name}\" (allowed headers: {', '.join(ALLOWED_HEADERS)})")
+
+		missing = [h for h in BASE_HEADERS if h not in self.headers]
+		if missing:
+			raise ParseError(f"[!] missing headers {missing} in file \"{file_name}\"")
+
+	def _get_defaults(self, length):
+		"""
+		the default setters of a row with `length` values
+		(a short row has no values for its last headers)
+		"""
+		if length not in self._defaults_of_length:
+			present = set(self.headers[:length])
+			self._defaults_of_length[length] = tuple(
+				setter
+				for header, setter in self._parser_class.DEFAULTS.items()
+				if header not in present
+			)
+		return self._defaults_of_length[length]
+
+	def decode(self, item, values):
+		"""
+		parses values into item, and returns the parsed values (by header)
+		"""
+		parsed = {
+			header: parser(item, value)
+			for (header, parser), value in zip(self.columns, values)
+		}
+
+		if len(values) >= len(self.columns):
+			defaults = self.defaults
+		else:
+			defaults = self._get_defaults(len(values))
+
+		for setter in defaults:
+			setter(item)
+
+		return parsed
@@ -0,0 +1,124 @@
+import threading
+
+from MoneyCsv.parsing.change_feed import diff_items
+
+
+class DataSnapshot(object):
+	"""
+	An immutable version of a loaded DataFile/DataFolder
+		data, titles, friends & locations are tuples, and are never modified after creation
+		cache holds values computed from this specific version (e.g. reports), thus it never has to be invalidated
+		changes is the ChangeSet versus the previous version (None for the first version)
+
+	a new version is built by a new snapshot, rather than by modifying an existing one
+	"""
+	def __init__(self, data_object, version=1, previous=None):
+		self._data_object = data_object
+		self._version     = version
+
+		self._data      = tuple(data_object.data)
+		self._titles    = tuple(sorted(set(i.group for i in self._data)))
+		self._friends   = tuple(getattr(data_object, "friends"  , ()))
+		self._locations = tuple(getattr(data_object, "locations", ()))
+
+		self._changes = None if previous is None else diff_items(previous.data, self._data)
+
+		self._cache = {}
+		self.hits = 0
+		self.misses = 0
+
+	def __repr__(self):
+		return "%s : version %d : %d items" % (
+			self.__class__.__name__,
+			self._version,
+			len(self._data),
+		)
+
+	def __getitem__(self, n):
+		return self._data[n]
+
+	def __len__(self):
+		return len(self._data)
+
+	@property
+	def version(self):
+		return self._version
+	@property
+	def data(self):
+		return self._data
+	@property
+	def titles(self):
+		return self._titles
+	@property
+	def friends(self):
+		return self._friends
+	@property
+	def locations(self):
+		return self._locations
+	@property
+	def changes(self):
+		return self._changes
+
+	def manifest(self):
+		return self._data_object.manifest()
+
+	def cached(self, key, factory):
+		"""
+		returns the value computed by `factory` for this version
+		two readers may compute the same key concurrently - the first stored value wins
+		"""
+		try:
+			value = self._cache[key]
+			self.hits += 1
+			return value
+		except KeyError:
+			self.misses += 1
+			return self._cache.setdefault(key, factory())
+
+
+class SnapshotPublisher(object):
+	"""
+	Holds the current DataSnapshot
+		readers take `publisher.current` once, and keep using it for the whole request
+		reload builds a new snapshot off to the side, and publishes it with a single reference assignment
+	thus readers always see a consistent version, and never wait for a reload
+	"""
+	def __init__(self, loader, prepare=None):
+		# loader is a callable which returns a new data object (e.g. a DataFolder)
+		self._loader = loader
+		# prepare is an optional callable, which gets every new snapshot before it is published
+		# 	(e.g. for filling its cache)
+		self._prepare = prepare
+
+		# serializes the reloads only. readers never take it
+		self._reload_lock = threading.Lock()
+
+		self._current = None
+		self.reload()
+
+	def __repr__(self):
+		return "%s : %s" % (
+			self.__class__.__name__,
+			self._current,
+		)
+
+	@property
+	def current(self):
+		return self._current
+
+	def reload(self):
+		with self._reload_lock:
+			if self._current is None:
+				version = 1
+			else:
+				version = self._current.version + 1
+
+			snapshot = DataSnapshot(self._loader(), version, self._current)
+
+			if self._prepare is not None:
+				self._prepare(snapshot)
+
+			# publish
+			self._current = snapshot
+
+		return snapshot
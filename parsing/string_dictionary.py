@@ -0,0 +1,82 @@
+class StringDictionary(object):
+	"""
+	maps each distinct string to an integer code (by order of appearance), and back
+		encoding a string returns the first copy of it which was seen (an interned copy),
+		thus every item of a dataset shares the same string object for the same value
+	codes are never removed nor reassigned, thus they stay valid as long as the dictionary lives
+		a reload builds a new dictionary (see DataFile.reload), thus codes are only comparable within a single load
+	"""
+	def __init__(self):
+		self._codes = {}
+		self._values = []
+
+	def __repr__(self):
+		return "%s : %d values" % (
+			self.__class__.__name__,
+			len(self._values),
+		)
+
+	def __len__(self):
+		return len(self._values)
+
+	def __iter__(self):
+		return iter(self._values)
+
+	def __contains__(self, value):
+		return value in self._codes
+
+	def encode(self, value):
+		"""
+		returns (interned value, code)
+		"""
+		code = self._codes.get(value)
+		if code is None:
+			code = self._codes[value] = len(self._values)
+			self._values.append(value)
+		return self._values[code], code
+
+	def code(self, value):
+		"""
+		returns None if the value was never seen
+		"""
+		return self._codes.get(value)
+
+	def decode(self, code):
+		return self._values[code]
+
+	def matching_codes(self, match):
+		"""
+		evaluates `match` once per distinct value
+		returns the codes of the values for which it returned True
+		"""
+		return frozenset(
+			code
+			for code, value in enumerate(self._values)
+			if match(value)
+		)
+
+
+class DatasetDictionary(object):
+	"""
+	the string dictionaries of a single dataset (a DataFile, or all the files of a DataFolder)
+		one dictionary per repetitive field. the codes of a field are exposed as `<field>_code`
+	"""
+	FIELDS = ("group", "currency", "payment", "frequency", "description")
+
+	def __init__(self):
+		self._fields = {
+			field: StringDictionary()
+			for field in self.FIELDS
+		}
+
+	def __repr__(self):
+		return "%s : %s" % (
+			self.__class__.__name__,
+			", ".join(f"{field} {len(d)}" for field, d in self._fields.items()),
+		)
+
+	def __getitem__(self, field):
+		return self._fields[field]
+
+	def encode(self, field, value):
+		return self._fields[field].encode(value)
@@ -8,3 +8,4 @@ from MoneyCsv.statistics.extra_details_statistics import DetailedStats_ExtraDeta
 from MoneyCsv.statistics.group_statistics         import DetailedStats_Group, \
 														 DetailedStats_Food
 from MoneyCsv.statistics.description_statistics   import DetailedStats_Description
+from MoneyCsv.statistics.pivot_statistics         import DetailedStats_Pivot
@@ -1,12 +1,14 @@
+import io
 import json
-import math
 import functools
-import numpy as np
 import matplotlib.pyplot as plt
 
 from MoneyCsv.utils import shorten_selected_time, format_dates
 from MoneyCsv.filters import SalaryFilter
 from MoneyCsv.parsing.consts import CURRENCY_SYMBOL_NIS
+from MoneyCsv.parsing.fixed_point import sum_amounts
+from MoneyCsv.statistics.chart_rendering import ChartSpec, CHART_CACHE, plot_pie, plot_bar
+from MoneyCsv.statistics.report_layout import ReportLayout
 
 # This is the only class with a different naming
 # 	What's usually 'amount', is here named 'money'
@@ -25,11 +27,11 @@ class Stats(object):
 
 	@property
 	def amount_of_money(self):
-		return sum(~SalaryFilter % self.data)
+		return sum_amounts(~SalaryFilter % self.data)
 
 	@property
 	def amount_of_salary(self):
-		return sum( SalaryFilter % self.data)
+		return sum_amounts( SalaryFilter % self.data)
 
 	@property
 	def amount_of_days(self):
@@ -114,6 +116,24 @@ class Stats(object):
 	def to_json(self):
 		return json.dumps(self.to_dict(), sort_keys=True)
 
+	def iter_rows(self):
+		"""
+		yields the statistics as rows (dicts), for the streaming exporters (see exporters.py)
+		"""
+		start_date, end_date = (self.data[0].date, self.data[-1].date) if self.data else (None, None)
+
+		yield {
+			"selected_time"       : self.selected_time,
+			"start"               : start_date.strftime("%Y/%m/%d") if start_date else None,
+			"end"                 : end_date.strftime("%Y/%m/%d")   if end_date   else None,
+			"days"                : self.amount_of_days,
+			"transactions"        : self.amount_of_transactions,
+			"money"               : self.amount_of_money,
+			"salary"              : self.amount_of_salary,
+			"transactions_per_day": self.transactions_per_day,
+			"money_per_day"       : self.money_per_day,
+		}
+
 	def to_pie(self, headers=None, values=None, title=None, save=True):
 		"""
 		if bool(save) is False: interactively show the pie chard
@@ -201,6 +221,7 @@ class DetailedStats(Stats):
 			2) values: each item is a list with the items
 		"""
 		titles = self._titles = self._get_titles()
+		self._aggregates = {}
 
 		values = self._values = list(map(
 			self._get_data_of_title,
@@ -240,7 +261,7 @@ class DetailedStats(Stats):
 		items = self._get_items_of_title(title)
 
 		amount_of_transactions = len(items)
-		amount_of_money = sum(items)
+		amount_of_money = sum_amounts(items)
 
 		if amount_of_transactions:
 			average_money_per_transaction = amount_of_money / amount_of_transactions
@@ -249,8 +270,16 @@ class DetailedStats(Stats):
 
 		return amount_of_transactions, amount_of_money, average_money_per_transaction
 
+	def _get_aggregates(self, title):
+		"""
+		_get_all_data_of_title, computed once per title (until the data is processed again)
+		"""
+		if title not in self._aggregates:
+			self._aggregates[title] = self._get_all_data_of_title(title)
+		return self._aggregates[title]
+
 	def _get_data_of_title(self, title):
-		amount_of_transactions, amount_of_money, average_money_per_transaction = self._get_all_data_of_title(title)
+		amount_of_transactions, amount_of_money, average_money_per_transaction = self._get_aggregates(title)
 
 		if self._grouping_method == "amount":
 			return amount_of_money
@@ -282,22 +311,35 @@ class DetailedStats(Stats):
 	def title(self, value):
 		self._title = value
 
-	def _plot_save(self, fig, save):
-		if save:
-			if save is True:
-				path = DEFAULT_PIE_PATH
-			else:
-				path = save
+	@require_processed_data
+	def chart_spec(self, chart_type):
+		"""
+		returns everything required for rendering the chart (see chart_rendering.py)
+		chart_type is either "pie" or "bar"
+		"""
+		return ChartSpec(
+			chart_type,
+			tuple(self.titles_sorted),
+			tuple(self.values_sorted),
+			self.title,
+			self._grouping_method,
+			self.amount_of_money,
+		)
 
-			fig.savefig(path)
-			plt.close(fig)
+	def _plot_save(self, chart_type, save):
+		"""
+		renders the chart (or takes it from the chart cache)
+		if save is True: return an in-memory handle of the png
+		if save is str: write the png to that path, and return an open handle to it
+		"""
+		png = CHART_CACHE.get_or_render(self.chart_spec(chart_type))
 
-			return open(path, "rb")
+		if save is True:
+			return io.BytesIO(png)
 
-		# plotting - interactive
-		else:
-			plt.show()
-			return None
+		with open(save, "wb") as handle:
+			handle.write(png)
+		return open(save, "rb")
 
 	def _plot_set_title(self, fig, ax):
 		ax.set_title(self.title)
@@ -305,29 +347,10 @@ class DetailedStats(Stats):
 		# fig.canvas.set_window_title(self.title)
 
 	def _plot_make_pie(self, ax, values, titles):
-		def pct(value):
-			# value is given as a percentage - a float between 0 to 100
-			amount_of_money = value * self.amount_of_money / 100
-			return f"{value:.1f}%\n{amount_of_money}{CURRENCY_SYMBOL_NIS}"
-
-		# making the pie chart
-		patches, _, _ = ax.pie(values, labels=titles, autopct=pct)
-		ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
-
-		return patches
+		return plot_pie(ax, values, titles, self.amount_of_money)
 
 	def _plot_make_bar(self, ax, values, titles):
-		# making the bar graph
-		x = np.arange(len(titles))  # the label locations
-		width = 0.35  # the width of the bars
-		rects = ax.bar(x, values, width)
-
-		# titles & labels
-		ax.set_ylabel(self._grouping_method)
-		ax.set_xticks(x)
-		ax.set_xticklabels(titles)
-
-		return rects
+		return plot_bar(ax, values, titles, self._grouping_method)
 
 	#
 	# Plotting
@@ -336,17 +359,20 @@ class DetailedStats(Stats):
 	def to_pie(self, save=True):
 		"""
 		if save:
-			return open handle to the file with the image
+			return a handle to the image
 
 			if save is str:
 				save the image to that path
 			if save is True:
-				save to the default location
+				keep the image in memory only
 
 		if bool(save) is False:
 			interactively show the pie chard
 		"""
-		# plotting initialization
+		if save:
+			return self._plot_save("pie", save)
+
+		# plotting - interactive
 		fig, ax = plt.subplots()
 
 		patches = self._plot_make_pie(ax, self.values_sorted, self.titles_sorted)
@@ -356,62 +382,40 @@ class DetailedStats(Stats):
 
 		self._plot_set_title(fig, ax)
 
-		return self._plot_save(fig, save)
+		plt.show()
+		return None
 
 	@require_processed_data
 	def to_bar(self, save=True):
 		"""
 		if save:
-			return open handle to the file with the image
+			return a handle to the image
 
 			if save is str:
 				save the image to that path
 			if save is True:
-				save to the default location
+				keep the image in memory only
 
 		if bool(save) is False:
 			interactively show the pie chard
 		"""
-		# plotting initialization
+		if save:
+			return self._plot_save("bar", save)
+
+		# plotting - interactive
 		fig, ax = plt.subplots()
 
 		self._plot_make_bar(ax, self.values_sorted, self.titles_sorted)
 
 		self._plot_set_title(fig, ax)
 
-		return self._plot_save(fig, save)
+		plt.show()
+		return None
 
 
 	#
 	# Text utils
 	#
-	def _generate_text(self, header, text_per_item, footer):
-		s  = header()
-
-		for t in self.titles_sorted:
-			s += "\n"
-			s += text_per_item(t)
-
-		if "Salary" in self._titles:
-			s += "\n"
-			s += "    " + '-'*50
-			s += "\n"
-			s += text_per_item("Salary")
-
-		s += "\n"
-		s += footer()
-
-		return s
-
-	@property
-	def _text_title_format(self):
-		return "%%-%ds" % (max(map(len, self.titles_sorted), default=1) + 1)
-
-	@property
-	def _money_str_format(self):
-		# 4 stands for ['-', '.', 2 digits after the dot, 'nis']
-		return "%%%d.2f" % (math.ceil(math.log10(max(map(abs, self.data)))) + 4)
-
 	def _text_generate_header(self):
 		s  = self.time_representation_str
 		s += "\n"
@@ -420,69 +424,50 @@ class DetailedStats(Stats):
 		s += f"  money per day = {self.money_per_day:.2f}"
 		return s
 
-	def _text_generate_footer(self):
-		if not self.titles_sorted:
-			return "    No titles found :("
-		if not self.amount_of_transactions:
-			return "    No transactions found :("
-
-		s  = "    " + '-'*50
-		s += "\n"
-		s += "    %s (%4d) : %.2f" % (
-			(self._text_title_format % "Total"),
-			self.amount_of_transactions,
-			self.amount_of_money,
-		)
-
-		if "Salary" in self._titles:
-			s += " -> "
-			# Salary is positive, amount_of_money is negative
-			s += "Net total %.2f" % (self.amount_of_salary + self.amount_of_money)
-		return s
-
-	def _text_generate_item(self, title):
-		amount_of_transactions, amount_of_money, average_money_per_transaction = self._get_all_data_of_title(title)
-
-		money_percentage = abs(amount_of_money / self.amount_of_money * 100.0)
-
-		return "    %s (%4d) : %s (%5.2f%%) │ item average %s" % (
-			(self._text_title_format % title),
-			amount_of_transactions,
-			(self._money_str_format % amount_of_money),
-			money_percentage,
-			(self._money_str_format % average_money_per_transaction),
-		)
-
-	def _telegram_generate_item(self, title):
-		amount_of_transactions, amount_of_money, average_money_per_transaction = self._get_all_data_of_title(title)
-
-		money_percentage = amount_of_money / self.amount_of_money * 100.0
-
-		return "    %s\n        (%4d) : %s (%5.2f%%)" % (
-			(self._text_title_format % title),
-			amount_of_transactions,
-			(self._money_str_format % amount_of_money),
-			money_percentage,
-		)
+	@require_processed_data
+	def report_layout(self):
+		return ReportLayout(self)
 
 	#
 	# Printing
 	#
-	@require_processed_data
 	def to_text(self):
-		return self._generate_text(
-			self._text_generate_header,
-			self._text_generate_item,
-			self._text_generate_footer,
-		)
+		return self.report_layout().to_text()
 
-	@require_processed_data
 	def to_telegram(self):
-		return self._generate_text(
-			self._text_generate_header,
-			self._telegram_generate_item,
-			self._text_generate_footer,
-		)
+		return self.report_layout().to_telegram()
+
+	def _row_of_title(self, title, total_money):
+		amount_of_transactions, amount_of_money, average_money_per_transaction = self._get_aggregates(title)
+
+		return {
+			"title"       : title,
+			"transactions": amount_of_transactions,
+			"money"       : amount_of_money,
+			"percentage"  : (amount_of_money / total_money * 100.0) if total_money else 0,
+			"average"     : average_money_per_transaction,
+		}
+
+	@require_processed_data
+	def iter_rows(self):
+		"""
+		yields a row per title (in the same order as the text), and a total row
+		"""
+		total_money = self.amount_of_money
+
+		for t in self.titles_sorted:
+			yield self._row_of_title(t, total_money)
+
+		if "Salary" in self._titles:
+			yield self._row_of_title("Salary", total_money)
+
+		yield {
+			"title"       : "Total",
+			"transactions": self.amount_of_transactions,
+			"money"       : total_money,
+			"percentage"  : 100.0,
+			"average"     : self.average_money_per_transaction,
+		}
 
 
 class DetailedStatsFiltered(DetailedStats):
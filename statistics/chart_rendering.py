@@ -0,0 +1,163 @@
+import io
+import json
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from MoneyCsv.consts import CHART_CACHE_MAX_BYTES, CHART_CACHE_MAX_ITEMS
+from MoneyCsv.parsing.consts import CURRENCY_SYMBOL_NIS
+
+# Rendering of pie & bar charts into png bytes.
+# A ChartSpec holds everything that affects the rendered image,
+# 	thus it is used both as the rendering input, and (hashed) as the key of the chart cache.
+
+# chart_type : "pie" or "bar"
+# ylabel     : the label of the y axis (used by bar graphs)
+# total      : the total amount of money (used by the pie labels)
+ChartSpec = namedtuple("ChartSpec", ("chart_type", "titles", "values", "title", "ylabel", "total"))
+
+def chart_key(spec):
+	"""
+	content-addressed key of a chart
+	"""
+	content = json.dumps(
+		[
+			spec.chart_type,
+			spec.title,
+			spec.ylabel,
+			float(spec.total),
+			[[t, float(v)] for t, v in zip(spec.titles, spec.values)],
+		],
+		ensure_ascii=False,
+	)
+	return hashlib.sha256(content.encode()).hexdigest()
+
+
+#
+# Plot utils
+#
+def plot_pie(ax, values, titles, total):
+	def pct(value):
+		# value is given as a percentage - a float between 0 to 100
+		amount_of_money = value * total / 100
+		return f"{value:.1f}%\n{amount_of_money}{CURRENCY_SYMBOL_NIS}"
+
+	# making the pie chart
+	# 	expenses are negative, while wedge sizes must be non negative
+	patches, _, _ = ax.pie(list(map(abs, values)), labels=titles, autopct=pct)
+	ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
+
+	return patches
+
+def plot_bar(ax, values, titles, ylabel):
+	# making the bar graph
+	x = np.arange(len(titles))  # the label locations
+	width = 0.35  # the width of the bars
+	rects = ax.bar(x, values, width)
+
+	# titles & labels
+	ax.set_ylabel(ylabel)
+	ax.set_xticks(x)
+	ax.set_xticklabels(titles)
+
+	return rects
+
+def render_chart(spec):
+	"""
+	renders the chart into png bytes
+	uses the object-oriented matplotlib API, thus it does not touch the global pyplot state
+	"""
+	fig = Figure()
+	ax = fig.subplots()
+
+	if spec.chart_type == "pie":
+		plot_pie(ax, spec.values, spec.titles, spec.total)
+	elif spec.chart_type == "bar":
+		plot_bar(ax, spec.values, spec.titles, spec.ylabel)
+	else:
+		raise ValueError(f"invalid chart_type: {spec.chart_type}")
+
+	ax.set_title(spec.title)
+
+	handle = io.BytesIO()
+	fig.savefig(handle, format="png")
+	return handle.getvalue()
+
+
+#
+# Cache
+#
+class ChartCache(object):
+	"""
+	LRU cache of rendered charts (png bytes), bounded by both the amount of items and their total size
+	"""
+	def __init__(self, max_bytes=CHART_CACHE_MAX_BYTES, max_items=CHART_CACHE_MAX_ITEMS):
+		self.max_bytes = max_bytes
+		self.max_items = max_items
+
+		self._items = OrderedDict()
+		self._size = 0
+		self._lock = threading.Lock()
+
+		self.hits = 0
+		self.misses = 0
+
+	def __repr__(self):
+		return "%s : %d items : %d bytes" % (
+			self.__class__.__name__,
+			len(self._items),
+			self._size,
+		)
+
+	def __len__(self):
+		return len(self._items)
+
+	def get(self, key):
+		with self._lock:
+			png = self._items.get(key)
+			if png is None:
+				self.misses += 1
+			else:
+				self.hits += 1
+				self._items.move_to_end(key)
+			return png
+
+	def put(self, key, png):
+		# never cache an item which alone exceeds the limit
+		if len(png) > self.max_bytes:
+			return
+
+		with self._lock:
+			if key in self._items:
+				self._size -= len(self._items.pop(key))
+
+			self._items[key] = png
+			self._size += len(png)
+
+			self._evict()
+
+	def _evict(self):
+		while self._size > self.max_bytes or len(self._items) > self.max_items:
+			_, png = self._items.popitem(last=False)
+			self._size -= len(png)
+
+	def clear(self):
+		with self._lock:
+			self._items.clear()
+			self._size = 0
+
+	def get_or_render(self, spec):
+		key = chart_key(spec)
+
+		png = self.get(key)
+		if png is None:
+			png = render_chart(spec)
+			self.put(key, png)
+
+		return png
+
+# the process-wide chart cache
+CHART_CACHE = ChartCache()
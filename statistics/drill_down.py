@@ -0,0 +1,278 @@
+from MoneyCsv.statistics.base_statistics import DetailedStats
+from MoneyCsv.statistics.description_statistics import NO_EXTRA_DETAILS
+from MoneyCsv.statistics.extra_details_statistics import DetailedStats_ExtraDetailWithName
+from MoneyCsv.filters import HasExtraDetailsFilter
+from MoneyCsv.parsing.fixed_point import amount_of, present_amount, is_fixed_point
+
+# A hierarchy of the data, computed in a single pass:
+# 	group -> stripped description -> extra-detail value
+# each node holds its items, and the aggregates of them (amount of transactions & amount of money)
+#
+# as in DetailedStats_Description, the values are of the single extra-details name of the description
+# 	(the items without that name are under NO_EXTRA_DETAILS), thus that level is built on first use,
+# 	once all of the items of the description are known
+#
+# used by the clickable pies - a click on a slice is a lookup of the child node,
+# 	rather than filtering the whole data again
+#
+# usage:
+# 	index = DrillDownIndex(data)
+# 	index.node("Food", "Burger")
+
+
+#
+# Levels
+# 	each level returns the keys of an item in that level (an item may have more than a single extra-detail value)
+# 	a level "by name" is keyed by the extra-details name of its parent node, thus it is built on first use
+#
+def _keys_of_group(node, item):
+	return (item.group, )
+
+def _keys_of_description(node, item):
+	return (item.description_stripped, )
+
+def _keys_of_extra_details(node, item):
+	return item.extra_details.get(node.extra_details_name) or (NO_EXTRA_DETAILS, )
+
+LEVELS = (
+	# name          , keys                  , by name
+	("group"        , _keys_of_group        , False),
+	("description"  , _keys_of_description  , False),
+	("extra_details", _keys_of_extra_details, True ),
+)
+
+
+class DrillDownNode(object):
+	def __init__(self, title, levels, fixed_point=False):
+		self.title = title
+		# the levels below this node
+		self.levels = levels
+		self._fixed_point = fixed_point
+
+		self.items = []
+		# None until the children of a level "by name" are built
+		self._children = None if self.by_name else {}
+		self._extra_details_names = None
+
+		self.amount_of_transactions = 0
+		# a sum of `amount_of` values (minor units in the fixed point mode)
+		self._amount = 0
+
+	def __repr__(self):
+		return "%s(%s) : %d items, %d children" % (
+			self.__class__.__name__,
+			self.title,
+			self.amount_of_transactions,
+			len(self.children),
+		)
+
+	@property
+	def level_name(self):
+		"""
+		the name of the level of the children (None for a leaf)
+			the extra-details name, for a level "by name"
+		"""
+		if self.by_name:
+			return self.extra_details_name
+		return self.levels[0][0] if self.levels else None
+
+	@property
+	def by_name(self):
+		return bool(self.levels) and self.levels[0][2]
+
+	@property
+	def extra_details_name(self):
+		"""
+		the single extra-details name of the items, as DetailedStats_Description picks it
+		raises ValueError if there is none, or more than one
+		"""
+		if self._extra_details_names is None:
+			self._extra_details_names = set().union(*(i.extra_details.keys() for i in self.items))
+
+		if len(self._extra_details_names) == 1:
+			return next(iter(self._extra_details_names))
+
+		if not self._extra_details_names:
+			raise ValueError("No possible extra_details_name found")
+
+		print(self._extra_details_names)
+		raise ValueError(f"Too many ({len(self._extra_details_names)}) possible extra_details_name found")
+
+	@property
+	def children(self):
+		if self._children is None:
+			self._children = {}
+			for i in self.items:
+				self._add_to_children(i, amount_of(i))
+		return self._children
+
+	@property
+	def amount_of_money(self):
+		return present_amount(self._amount, self._fixed_point)
+
+	def add(self, item, amount):
+		self.items.append(item)
+		self.amount_of_transactions += 1
+		self._amount += amount
+
+		# the children of a level "by name" are built on first use (see `children`)
+		if self._children is not None and self.levels:
+			self._add_to_children(item, amount)
+
+	def _add_to_children(self, item, amount):
+		for key in self.levels[0][1](self, item):
+			child = self._children.get(key)
+			if child is None:
+				child = self._children[key] = DrillDownNode(key, self.levels[1:], self._fixed_point)
+			child.add(item, amount)
+
+	@property
+	def can_drill_down(self):
+		if self.by_name:
+			# items without extra details have nothing to show
+			# (a description with several names is refused on click, as in DetailedStats_Description)
+			return any(i.extra_details for i in self.items)
+		return bool(self.children)
+
+	def get_all_data(self):
+		"""
+		the same tuple as DetailedStats._get_all_data_of_title
+		"""
+		amount_of_money = self.amount_of_money
+
+		if self.amount_of_transactions:
+			average_money_per_transaction = amount_of_money / self.amount_of_transactions
+		else:
+			average_money_per_transaction = 0
+
+		return self.amount_of_transactions, amount_of_money, average_money_per_transaction
+
+
+class DrillDownIndex(object):
+	def __init__(self, data, levels=LEVELS):
+		self.root = DrillDownNode("All", levels, is_fixed_point(data))
+
+		for i in data:
+			self.root.add(i, amount_of(i))
+
+	def __repr__(self):
+		return "%s : %d items" % (
+			self.__class__.__name__,
+			self.root.amount_of_transactions,
+		)
+
+	def node(self, *path):
+		"""
+		raises KeyError if the path does not exist
+		"""
+		node = self.root
+		for title in path:
+			node = node.children[title]
+		return node
+
+
+def get_drill_down_index(stats, levels=LEVELS):
+	"""
+	the index of stats.data, built on the first click and kept on the stats object
+	"""
+	if getattr(stats, "_drill_down_index", None) is None:
+		stats._drill_down_index = DrillDownIndex(stats.data, levels)
+	return stats._drill_down_index
+
+
+# the statistics of the children of a node
+class DetailedStats_DrillDown(DetailedStats):
+	def __init__(self, node, time_filter=None, grouping_method="time", sorting_method="by_value"):
+		super().__init__(node.items, time_filter, grouping_method, sorting_method)
+
+		self._node = node
+
+	@property
+	def title(self):
+		return getattr(
+			self,
+			"_title",
+			(
+				f"{getattr(self, '_title_prefix', '')}"
+				f"{self._node.title} by {self._node.level_name}"
+				f"({self._grouping_method})"
+				 " - "
+				f"{self.selected_time}"
+			)
+		)
+
+	@title.setter
+	def title(self, value):
+		self._title = value
+
+	def _get_titles(self):
+		self._titles = sorted(self._node.children)
+		return self._titles
+
+	def _get_items_of_title(self, title):
+		return self._node.children[title].items
+
+	def _get_all_data_of_title(self, title):
+		return self._node.children[title].get_all_data()
+
+	def _plot_make_pie_clickable(self, fig, patches):
+		def onclick(event):
+			label = event.artist.get_label()
+
+			if self._node.by_name:
+				# the leaves - the values of the extra-details name, without the items which miss it
+				print_extra_details(self, self._node)
+			else:
+				print_drill_down(self, self._node.children[label])
+
+		for patch in patches:
+			label = patch.get_label()
+			if self._node.by_name:
+				if label != NO_EXTRA_DETAILS:
+					patch.set_picker(True)
+			elif self._node.children[label].can_drill_down:
+				patch.set_picker(True)
+
+		fig.canvas.mpl_connect('pick_event', onclick)
+
+def print_drill_down(stats, node):
+	"""
+	prints & shows the statistics of node, as a click-through of stats
+	"""
+	g = DetailedStats_DrillDown(
+		node,
+		time_filter=stats._time_filter,
+		grouping_method=stats._grouping_method,
+		sorting_method=stats._sorting_method,
+	)
+
+	# Set title prefix
+	g._title_prefix = getattr(stats, "_title_prefix", '') + f"{stats.__class__.__name__}({stats._grouping_method}) / "
+
+	print(f"=== {node.title} ===")
+	print(g.to_text())
+	g.to_pie(save=False)
+
+	return g
+
+def print_extra_details(stats, node):
+	"""
+	prints & shows the values of the extra-details name of node, as a click-through of stats
+	"""
+	g = DetailedStats_ExtraDetailWithName(
+		HasExtraDetailsFilter(),
+		node.extra_details_name,
+		node.items,
+		time_filter=stats._time_filter,
+		grouping_method=stats._grouping_method,
+		sorting_method=stats._sorting_method,
+	)
+
+	# Set title prefix
+	g._title_prefix = getattr(stats, "_title_prefix", '') + f"{stats.__class__.__name__}({stats._grouping_method}) / "
+
+	print(f"=== {node.title} ===")
+	print(g.to_text())
+	g.to_pie(save=False)
+
+	return g
@@ -0,0 +1,140 @@
+import csv
+import json
+
+from MoneyCsv.consts import EXPORT_CHUNK_SIZE
+from MoneyCsv.parsing.consts import EXTRA_DETAILS_SEPERATOR
+
+# Streaming exporters
+# 	rows (dicts) are formatted one by one, and written to the handle every `chunk_size` rows
+# 	thus exporting the whole history never holds more than a single chunk of text in memory,
+# 	and the first rows are written before the last ones are formatted
+#
+# usage:
+# 	export_items(data, sys.stdout, "csv")
+# 	export_stats(g, handle, "jsonl")
+
+
+#
+# Rows
+#
+def item_to_row(item):
+	return {
+		"date"         : item._format_date(),
+		"amount"       : item.amount,
+		"currency"     : item.currency,
+		"amount_nis"   : float(item),
+		"group"        : item.group,
+		"description"  : item.description,
+		"payment"      : getattr(item, "payment"  , None),
+		"frequency"    : getattr(item, "frequency", None),
+		"friends"      : item.friends,
+		"location"     : item.location,
+		"extra_details": item.extra_details,
+	}
+
+def iter_item_rows(items):
+	return map(item_to_row, items)
+
+
+#
+# Formats
+#
+class StreamExporter(object):
+	def __init__(self, handle, chunk_size=EXPORT_CHUNK_SIZE):
+		self._handle = handle
+		self._chunk_size = chunk_size
+
+		self._buffer = []
+		self.rows = 0
+
+	# used as the file object of csv.writer
+	def write(self, s):
+		self._buffer.append(s)
+
+	def flush(self):
+		if self._buffer:
+			self._handle.write(''.join(self._buffer))
+			self._buffer.clear()
+
+		if hasattr(self._handle, "flush"):
+			self._handle.flush()
+
+	def _write_row(self, row):
+		raise NotImplementedError
+
+	def write_rows(self, rows):
+		for row in rows:
+			self._write_row(row)
+			self.rows += 1
+
+			if self.rows % self._chunk_size == 0:
+				self.flush()
+
+		self.flush()
+		return self.rows
+
+class CsvExporter(StreamExporter):
+	def __init__(self, handle, chunk_size=EXPORT_CHUNK_SIZE):
+		super().__init__(handle, chunk_size)
+		self._writer = csv.writer(self)
+		self._headers = None
+
+	@staticmethod
+	def _format_value(value):
+		if value is None:
+			return ''
+		if isinstance(value, (list, tuple)):
+			return EXTRA_DETAILS_SEPERATOR.join(map(str, value))
+		if isinstance(value, dict):
+			# the same syntax as in the description - name (value ; value)
+			return ' '.join(
+				f"{k} ({EXTRA_DETAILS_SEPERATOR.join(v)})"
+				for k, v in value.items()
+			)
+		return value
+
+	def _write_row(self, row):
+		# the headers are taken from the first row
+		if self._headers is None:
+			self._headers = list(row)
+			self._writer.writerow(self._headers)
+
+		self._writer.writerow(
+			self._format_value(row.get(header))
+			for header in self._headers
+		)
+
+class JsonLinesExporter(StreamExporter):
+	def _write_row(self, row):
+		self.write(json.dumps(row, ensure_ascii=False))
+		self.write('\n')
+
+# NDJSON and JSON Lines are the same format
+EXPORTERS = {
+	"csv"   : CsvExporter,
+	"jsonl" : JsonLinesExporter,
+	"ndjson": JsonLinesExporter,
+}
+
+
+#
+# Exporting
+#
+def get_exporter(handle, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+	try:
+		return EXPORTERS[export_format.lower()](handle, chunk_size)
+	except KeyError:
+		raise ValueError(f"invalid export format: {export_format} (use one of {', '.join(EXPORTERS)})") from None
+
+def export_items(items, handle, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+	"""
+	returns the amount of exported rows
+	"""
+	return get_exporter(handle, export_format, chunk_size).write_rows(iter_item_rows(items))
+
+def export_stats(g, handle, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+	"""
+	exports the aggregated rows of a stats object (see `iter_rows`)
+	returns the amount of exported rows
+	"""
+	return get_exporter(handle, export_format, chunk_size).write_rows(g.iter_rows())
@@ -58,9 +58,10 @@ class DetailedStats_ExtraDetail(DetailedStats_ExtraDetails_Abstract):
 		# using the filtered data, the extra_details_name is extracted
 		self._get_extra_details_name()
 		# now, the filter_object is further narrowed
-		self._filter_obj &= ExtraDetailsFilter(self._extra_details_name)
-		# and the data is being filtered, again
-		self.data = self._filter_obj % self.data
+		extra_details_filter = ExtraDetailsFilter(self._extra_details_name)
+		self._filter_obj &= extra_details_filter
+		# and the data is being filtered, again. only the new part of the filter is evaluated
+		self.data = extra_details_filter % self.data
 
 
 	def _get_extra_details_name(self):
@@ -1,10 +1,35 @@
+from collections import defaultdict
+
 from MoneyCsv.statistics.base_statistics import DetailedStats
-from MoneyCsv.statistics.group_statistics import DetailedStats_Group
+from MoneyCsv.statistics.drill_down import get_drill_down_index, print_drill_down
 from MoneyCsv.filters import GroupFilter, FriendFilter, LocationFilter
 from MoneyCsv.utils import re_exact
 
 class DetailedStats_AllGroups(DetailedStats):
 	def _get_titles(self):
+		self._dictionary = self._get_dictionary()
+		if self._dictionary is None:
+			return self._get_titles_by_string()
+
+		# a single pass over the data, bucketing the items by the code of their group
+		self._items_by_group_code = defaultdict(list)
+		for i in self.data:
+			self._items_by_group_code[i.group_code].append(i)
+
+		titles = set()
+
+		for items in self._items_by_group_code.values():
+			t = items[0].group
+			if not t:
+				for i in items:
+					print(f"empty group for: {i}")
+			titles.add(t)
+
+		# return a list, sorted alphabetically
+		self._titles = sorted(titles)
+		return self._titles
+
+	def _get_titles_by_string(self):
 		titles = set()
 
 		for i in self.data:
@@ -17,6 +42,40 @@ class DetailedStats_AllGroups(DetailedStats):
 		self._titles = sorted(titles)
 		return self._titles
 
+	def _get_dictionary(self):
+		"""
+		returns the string dictionary of the data
+		or None, if the data is empty or comes from more than a single dataset (thus the codes are not comparable)
+		"""
+		if not self.data:
+			return None
+
+		dictionary = self.data[0]._dictionary
+		if all(i._dictionary is dictionary for i in self.data):
+			return dictionary
+
+		return None
+
+	def _get_items_of_title(self, title):
+		if self._dictionary is None:
+			return super()._get_items_of_title(title)
+
+		# the filter of the title may match more than a single group (e.g. "Food" matches "Fast Food")
+		codes = [
+			code
+			for code in self._get_filter_of_title(title).matching_codes(self._dictionary)
+			if code in self._items_by_group_code
+		]
+
+		if not codes:
+			return []
+		if len(codes) == 1:
+			return list(self._items_by_group_code[codes[0]])
+
+		# keep the order of the data
+		codes = set(codes)
+		return [i for i in self.data if i.group_code in codes]
+
 	def _get_filter_of_title(self, title):
 		return GroupFilter(re_exact(title), case_sensitive=True, regex=True)
 
@@ -26,23 +85,8 @@ class DetailedStats_AllGroups(DetailedStats):
 			patch = event.artist
 			label = patch.get_label()
 
-			# Create a grouped-stats object for that label
-			g = DetailedStats_Group(
-				self.data,
-				group_name=re_exact(label),
-				time_filter=self._time_filter,
-				grouping_method=self._grouping_method,
-				sorting_method=self._sorting_method,
-				case_sensitive=False, regex=True,
-			)
-
-			# Set title prefix
-			g._title_prefix = getattr(self, "_title_prefix", '') + f"{self.__class__.__name__}({self._grouping_method}) / "
-
-
-			print(f"=== {label} ===")
-			print(g.to_text())
-			g.to_pie(save=False)
+			# the descriptions of that group (see drill_down.py)
+			print_drill_down(self, get_drill_down_index(self).node(label))
 
 		for patch in patches:
 			patch.set_picker(True)
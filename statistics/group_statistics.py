@@ -1,5 +1,7 @@
+from collections import defaultdict
+
 from MoneyCsv.statistics.base_statistics import DetailedStatsFiltered
-from MoneyCsv.statistics.description_statistics import DetailedStats_Description
+from MoneyCsv.statistics.drill_down import LEVELS, get_drill_down_index, print_drill_down
 from MoneyCsv.filters import GroupFilter
 from MoneyCsv.utils import re_exact
 
@@ -27,23 +29,21 @@ class DetailedStats_Group(DetailedStatsFiltered):
 
 
 	def _get_titles(self):
-		titles = set()
-
+		# a single pass over the data, bucketing the items by their stripped description
+		self._items_by_title = defaultdict(list)
 		for i in self.data:
-			t = i.description_stripped
-			if not t:
+			self._items_by_title[i.description_stripped].append(i)
+
+		if '' in self._items_by_title:
+			for i in self._items_by_title['']:
 				print(f"empty stripped description for: {i}")
-			titles.add(t)
 
 		# return a list, sorted alphabetically
-		self._titles = sorted(titles)
+		self._titles = sorted(self._items_by_title)
 		return self._titles
 
 	def _get_items_of_title(self, title):
-		return list(filter(
-			lambda i: title == i.description_stripped,
-			self.data
-		))
+		return list(self._items_by_title.get(title, ()))
 
 	def _plot_make_pie_clickable(self, fig, patches):
 		def onclick(event):
@@ -51,31 +51,15 @@ class DetailedStats_Group(DetailedStatsFiltered):
 			patch = event.artist
 			label = patch.get_label()
 
-			# Create a grouped-stats object for that label
-			try:
-				g = DetailedStats_Description(
-					self.data,
-					description_text=re_exact(label),
-					time_filter=self._time_filter,
-					grouping_method=self._grouping_method,
-					sorting_method=self._sorting_method,
-					case_sensitive=False, regex=True,
-				)
-			except ValueError as exc:
-				if exc.args == ("No possible extra_details_name found", ):
-					return
-				else:
-					raise
-
-			# Set title prefix
-			g._title_prefix = getattr(self, "_title_prefix", '') + f"{self.__class__.__name__}({self._grouping_method}) / "
-
-			print(f"=== {label} ===")
-			print(g.to_text())
-			g.to_pie(save=False)
+			# the extra details of that description (see drill_down.py)
+			print_drill_down(self, self._drill_down_index.node(label))
+
+		# the titles are stripped descriptions, thus the index starts at the description level
+		get_drill_down_index(self, LEVELS[1:])
 
 		for patch in patches:
-			patch.set_picker(True)
+			if self._drill_down_index.node(patch.get_label()).can_drill_down:
+				patch.set_picker(True)
 
 		fig.canvas.mpl_connect('pick_event', onclick)
 
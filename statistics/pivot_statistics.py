@@ -0,0 +1,294 @@
+import datetime
+
+from MoneyCsv.statistics.base_statistics import DetailedStats, require_processed_data
+from MoneyCsv.statistics.chart_rendering import ChartSpec
+from MoneyCsv.parsing.fixed_point import amount_of, present_amount, is_fixed_point
+from MoneyCsv.consts import WEEK_STARTS_AT_SUNDAY
+
+# A group x period matrix, computed in a single pass over the data
+# 	rows    : the groups (sorted as in the other DetailedStats)
+# 	columns : every period between the first and the last item (including periods without items)
+# 	each cell holds the amount of transactions & the amount of money of a group in a period
+#
+# the text adds a total per period (without Salary, as in `amount_of_money`), and its delta versus the previous period
+# the bar graph shows the total per period
+
+
+#
+# Periods
+# 	a period is represented by its first day (a datetime.date)
+#
+def _start_of_week(date):
+	# the same offset as the week commands of the telegram bot
+	if WEEK_STARTS_AT_SUNDAY:
+		weekday = date.weekday() + WEEK_STARTS_AT_SUNDAY
+		if weekday == 7:
+			weekday = 0
+	else:
+		weekday = date.weekday()
+	return date - datetime.timedelta(days=weekday)
+
+def _start_of_month(date):
+	return datetime.date(date.year, date.month, 1)
+
+def _start_of_year(date):
+	return datetime.date(date.year, 1, 1)
+
+def _next_week(start):
+	return start + datetime.timedelta(days=7)
+
+def _next_month(start):
+	if start.month == 12:
+		return datetime.date(start.year + 1, 1, 1)
+	return datetime.date(start.year, start.month + 1, 1)
+
+def _next_year(start):
+	return datetime.date(start.year + 1, 1, 1)
+
+# period name : (start of the period of a date, start of the following period, label format)
+PERIODS = {
+	"week" : (_start_of_week , _next_week , "%Y/%m/%d"),
+	"month": (_start_of_month, _next_month, "%Y/%m"   ),
+	"year" : (_start_of_year , _next_year , "%Y"      ),
+}
+
+
+class DetailedStats_Pivot(DetailedStats):
+	def __init__(self, data, period="month", time_filter=None, grouping_method="amount", sorting_method="by_value"):
+		super().__init__(data, time_filter, grouping_method, sorting_method)
+
+		self._period = period.lower()
+		if self._period not in PERIODS:
+			raise ValueError(f"invalid period: {period} (use one of {', '.join(PERIODS)})")
+
+	@property
+	def title(self):
+		return getattr(
+			self,
+			"_title",
+			f"{self.__class__.__name__}({self._grouping_method} per {self._period}) - {self.selected_time}"
+		)
+
+	@title.setter
+	def title(self, value):
+		self._title = value
+
+
+	#
+	# Scanning
+	#
+	def _scan(self):
+		"""
+		a single pass over the data
+		sets:
+			self._periods : a list of the periods (datetime.date), without gaps
+			self._cells   : {group: {period: [amount_of_transactions, amount_of_money]}}
+				(amount_of_money is a sum of `amount_of` values, thus in minor units in the fixed point mode)
+		"""
+		start_of, next_of, _ = PERIODS[self._period]
+
+		cells = {}
+		# the start of the period of each distinct date (most items share a date with other items)
+		period_of_date = {}
+
+		for i in self.data:
+			date = i.date.date() if isinstance(i.date, datetime.datetime) else i.date
+
+			period = period_of_date.get(date)
+			if period is None:
+				period = period_of_date[date] = start_of(date)
+
+			cell = cells.setdefault(i.group, {}).setdefault(period, [0, 0])
+			cell[0] += 1
+			cell[1] += amount_of(i)
+
+		periods = []
+		if period_of_date:
+			period = min(period_of_date.values())
+			last   = max(period_of_date.values())
+			while period <= last:
+				periods.append(period)
+				period = next_of(period)
+
+		self._periods = periods
+		self._cells = cells
+		self._fixed_point = is_fixed_point(self.data)
+
+	def _get_titles(self):
+		self._scan()
+
+		self._titles = sorted(self._cells)
+		return self._titles
+
+	def _get_all_data_of_title(self, title):
+		cells = self._cells.get(title, {}).values()
+
+		amount_of_transactions = sum(c[0] for c in cells)
+		amount_of_money        = present_amount(sum(c[1] for c in cells), self._fixed_point)
+
+		if amount_of_transactions:
+			average_money_per_transaction = amount_of_money / amount_of_transactions
+		else:
+			average_money_per_transaction = 0
+
+		return amount_of_transactions, amount_of_money, average_money_per_transaction
+
+	def _value_of_cell(self, cell):
+		"""
+		returns None for a period without transactions
+		"""
+		if cell is None or not cell[0]:
+			return None
+
+		amount_of_money = present_amount(cell[1], self._fixed_point)
+
+		if self._grouping_method == "amount":
+			return amount_of_money
+		elif self._grouping_method == "transactions":
+			return cell[0]
+		elif self._grouping_method == "amount_average":
+			return amount_of_money / cell[0]
+		else:
+			raise ValueError(f"invalid grouping_method: {self._grouping_method}")
+
+
+	#
+	# Matrix
+	#
+	@require_processed_data
+	def period_labels(self):
+		label_format = PERIODS[self._period][2]
+		return [p.strftime(label_format) for p in self._periods]
+
+	@require_processed_data
+	def values_of_title(self, title):
+		"""
+		returns a value per period (None for periods without transactions)
+		"""
+		cells = self._cells.get(title, {})
+		return [self._value_of_cell(cells.get(p)) for p in self._periods]
+
+	@require_processed_data
+	def period_totals(self):
+		"""
+		returns a value per period, of all the groups but Salary
+		"""
+		totals = []
+
+		for p in self._periods:
+			cell = [0, 0]
+			for title, cells in self._cells.items():
+				if title == "Salary" or p not in cells:
+					continue
+				cell[0] += cells[p][0]
+				cell[1] += cells[p][1]
+			totals.append(self._value_of_cell(cell))
+
+		return totals
+
+	@require_processed_data
+	def period_deltas(self):
+		"""
+		returns the change of each period total versus the previous period (None for the first period)
+		"""
+		totals = [t or 0 for t in self.period_totals()]
+		return [None] + [b - a for a, b in zip(totals, totals[1:])]
+
+
+	#
+	# Text
+	#
+	def _format_value(self, value):
+		if value is None:
+			return '-'
+		if self._grouping_method == "transactions":
+			return "%d" % value
+		return "%.2f" % value
+
+	def _text_rows(self):
+		"""
+		returns a list of rows (title, [value per period]). None stands for a separator
+		"""
+		rows = [(t, self.values_of_title(t)) for t in self.titles_sorted]
+
+		if "Salary" in self._titles:
+			rows.append(None)
+			rows.append(("Salary", self.values_of_title("Salary")))
+
+		rows.append(None)
+		rows.append(("Total", self.period_totals()))
+		rows.append(("Delta", self.period_deltas()))
+
+		return rows
+
+	@require_processed_data
+	def to_text(self):
+		s = self._text_generate_header()
+
+		if not self._periods:
+			return s + "\n    No transactions found :("
+
+		rows = self._text_rows()
+		labels = self.period_labels()
+
+		# the width of each column is the width of its longest cell
+		title_width = max(len(r[0]) for r in rows if r is not None)
+		widths = [
+			max(len(label), *(len(self._format_value(r[1][n])) for r in rows if r is not None))
+			for n, label in enumerate(labels)
+		]
+
+		def format_row(title, cells):
+			return "    %s │ %s" % (
+				title.ljust(title_width),
+				" │ ".join(c.rjust(w) for c, w in zip(cells, widths)),
+			)
+
+		lines = [format_row('', labels)]
+		for r in rows:
+			if r is None:
+				lines.append("    " + "─" * (title_width + sum(w + 3 for w in widths)))
+			else:
+				lines.append(format_row(r[0], map(self._format_value, r[1])))
+
+		return s + "\n" + "\n".join(lines)
+
+	def to_telegram(self):
+		return self.to_text()
+
+
+	#
+	# Exporting
+	#
+	@require_processed_data
+	def iter_rows(self):
+		"""
+		yields a row per title (a column per period), and the total & delta rows
+		"""
+		labels = self.period_labels()
+
+		for r in self._text_rows():
+			if r is not None:
+				yield {"title": r[0], **dict(zip(labels, r[1]))}
+
+	@require_processed_data
+	def chart_spec(self, chart_type):
+		"""
+		the bar graph shows the total per period. the pie shows the total per group
+		"""
+		if chart_type != "bar":
+			return super().chart_spec(chart_type)
+
+		return ChartSpec(
+			chart_type,
+			tuple(self.period_labels()),
+			tuple(t or 0 for t in self.period_totals()),
+			self.title,
+			self._grouping_method,
+			self.amount_of_money,
+		)
+
+	def _plot_make_bar(self, ax, values, titles):
+		# the interactive bar graph shows the same as the saved one
+		spec = self.chart_spec("bar")
+		return super()._plot_make_bar(ax, spec.values, spec.titles)
@@ -0,0 +1,82 @@
+import multiprocessing
+import concurrent.futures
+
+from MoneyCsv.consts import RENDER_POOL_WORKERS
+from MoneyCsv.statistics.chart_rendering import CHART_CACHE, chart_key, render_chart
+
+
+def _initialize_worker():
+	# headless backend - the workers never show anything interactively
+	import matplotlib
+	matplotlib.use("Agg")
+
+	# preload the heavy modules, so that the first job does not pay for importing them
+	import matplotlib.figure
+	import matplotlib.backends.backend_agg
+
+def _warm_up():
+	return True
+
+
+class ChartRenderPool(object):
+	"""
+	renders charts in a small pool of worker processes
+
+	usage:
+		future = pool.submit(stats.chart_spec("pie"))
+		future.add_done_callback(...)
+		# or
+		png = future.result()
+
+	the result is the png bytes of the chart
+	rendered charts are stored in the chart cache, thus a cache hit returns an already completed future
+	"""
+	def __init__(self, workers=RENDER_POOL_WORKERS, cache=CHART_CACHE):
+		self._cache = cache
+		self._workers = workers
+
+		self._executor = concurrent.futures.ProcessPoolExecutor(
+			max_workers=workers,
+			# the bot runs a few threads. forking it is unsafe
+			mp_context=multiprocessing.get_context("spawn"),
+			initializer=_initialize_worker,
+		)
+
+		self._preload_workers()
+
+	def __repr__(self):
+		return "%s : %d workers" % (
+			self.__class__.__name__,
+			self._workers,
+		)
+
+	@property
+	def cache(self):
+		return self._cache
+
+	def _preload_workers(self):
+		# processes are spawned lazily. submitting a job per worker forces them to start now
+		futures = [self._executor.submit(_warm_up) for _ in range(self._workers)]
+		concurrent.futures.wait(futures)
+
+	def submit(self, spec):
+		key = chart_key(spec)
+
+		png = self._cache.get(key)
+		if png is not None:
+			future = concurrent.futures.Future()
+			future.set_result(png)
+			return future
+
+		future = self._executor.submit(render_chart, spec)
+		future.add_done_callback(lambda f: self._store_result(key, f))
+		return future
+
+	def _store_result(self, key, future):
+		if future.cancelled() or future.exception() is not None:
+			return
+
+		self._cache.put(key, future.result())
+
+	def shutdown(self, wait=True):
+		self._executor.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,104 @@
+import math
+
+# The layout of the text of a DetailedStats
+# 	the totals, the column widths and the rows (title, transactions, money, average) are computed once,
+# 	from the aggregated table. then each output line is a single template substitution,
+# 	and the lines are joined once
+#
+# thus the formatting cost depends on the amount of output lines, rather than on the amount of items
+
+SEPARATOR = "    " + '-'*50
+
+TEXT_ITEM_TEMPLATE     = "    %s (%4d) : %s (%5.2f%%) │ item average %s"
+TELEGRAM_ITEM_TEMPLATE = "    %s\n        (%4d) : %s (%5.2f%%)"
+TOTAL_TEMPLATE         = "    %s (%4d) : %.2f"
+
+
+class ReportLayout(object):
+	def __init__(self, stats):
+		self.header = stats._text_generate_header()
+
+		self.titles = list(stats.titles_sorted)
+		self.has_salary = "Salary" in stats._titles
+
+		# aggregated once - each of these is a pass over the items
+		self.amount_of_transactions = stats.amount_of_transactions
+		self.amount_of_money        = stats.amount_of_money
+		self.amount_of_salary       = stats.amount_of_salary if self.has_salary else 0
+
+		# (amount_of_transactions, amount_of_money, average_money_per_transaction) per title
+		self.rows = {
+			t: stats._get_aggregates(t)
+			for t in self.titles + (["Salary"] if self.has_salary else [])
+		}
+
+		self.title_format = "%%-%ds" % (max(map(len, self.titles), default=1) + 1)
+
+		# the money column fits the largest single item
+		# 	4 stands for ['-', '.', 2 digits after the dot, 'nis']
+		# (not computed without rows, since an empty data has no largest item)
+		if self.rows:
+			self.money_format = "%%%d.2f" % (math.ceil(math.log10(max(map(abs, stats.data)))) + 4)
+
+	#
+	# Lines
+	#
+	def _text_item(self, title):
+		amount_of_transactions, amount_of_money, average_money_per_transaction = self.rows[title]
+
+		return TEXT_ITEM_TEMPLATE % (
+			self.title_format % title,
+			amount_of_transactions,
+			self.money_format % amount_of_money,
+			abs(amount_of_money / self.amount_of_money * 100.0),
+			self.money_format % average_money_per_transaction,
+		)
+
+	def _telegram_item(self, title):
+		amount_of_transactions, amount_of_money, average_money_per_transaction = self.rows[title]
+
+		return TELEGRAM_ITEM_TEMPLATE % (
+			self.title_format % title,
+			amount_of_transactions,
+			self.money_format % amount_of_money,
+			amount_of_money / self.amount_of_money * 100.0,
+		)
+
+	def _footer(self):
+		if not self.titles:
+			return ["    No titles found :("]
+		if not self.amount_of_transactions:
+			return ["    No transactions found :("]
+
+		total = TOTAL_TEMPLATE % (
+			self.title_format % "Total",
+			self.amount_of_transactions,
+			self.amount_of_money,
+		)
+
+		if self.has_salary:
+			# Salary is positive, amount_of_money is negative
+			total += " -> Net total %.2f" % (self.amount_of_salary + self.amount_of_money)
+
+		return [SEPARATOR, total]
+
+	def _render(self, item):
+		lines = [self.header]
+		lines.extend(map(item, self.titles))
+
+		if self.has_salary:
+			lines.append(SEPARATOR)
+			lines.append(item("Salary"))
+
+		lines.extend(self._footer())
+
+		return '\n'.join(lines)
+
+	#
+	# Exported functions
+	#
+	def to_text(self):
+		return self._render(self._text_item)
+
+	def to_telegram(self):
+		return self._render(self._telegram_item)
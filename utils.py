@@ -14,6 +14,19 @@ def newest(path=DEFAULT_DATA_DIRECTORY):
 	paths = [os.path.join(path, basename) for basename in files]
 	return max(paths, key=os.path.getctime)
 
+# (path, size, mtime) of every file, sorted by path
+def get_files_manifest(paths):
+	manifest = []
+
+	for path in paths:
+		try:
+			stat = os.stat(path)
+		except FileNotFoundError:
+			continue
+		manifest.append((path, stat.st_size, stat.st_mtime_ns))
+
+	return tuple(sorted(manifest))
+
 #
 # parsing utils
 #